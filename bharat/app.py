@@ -1,11 +1,11 @@
 from flask import Flask, render_template, request, jsonify
 from .models import db, Metric, Incident
 from .services.database import get_recent_metrics, get_connection
-from bharat.services.scheduler_service import start_scheduler
+from bharat.services.engine_process import start_engine
 from bharat.routes.monitoring_routes import monitoring_bp
 from bharat.services.config import DB_PATH
+from bharat.services.migrations import run_migrations
 
-import threading
 import os
 
 
@@ -31,6 +31,9 @@ def create_app():
     with app.app_context():
         db.create_all()
 
+    # Bring pre-existing databases up to the current schema
+    run_migrations()
+
     print(f"✅ Database ready at: {DB_PATH}")
 
     # -----------------------------------------------------
@@ -65,18 +68,6 @@ def create_app():
 app = create_app()
 
 
-# =========================================================
-# Background Scheduler
-# =========================================================
-def run_scheduler(app):
-
-    print("🟢 Scheduler thread started")
-
-    # Ensure Flask context available to background tasks
-    with app.app_context():
-        start_scheduler()
-
-
 # =========================================================
 # Main Entry
 # =========================================================
@@ -85,16 +76,10 @@ if __name__ == "__main__":
     print("🚀 Starting SentinelOps...")
 
     # -----------------------------------------------------
-    # Start scheduler ONCE (handles debug reloader)
+    # Start engine ONCE (handles debug reloader)
     # -----------------------------------------------------
     if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-
-        scheduler_thread = threading.Thread(
-            target=run_scheduler,
-            args=(app,),
-            daemon=True
-        )
-        scheduler_thread.start()
+        start_engine(app)
 
     # -----------------------------------------------------
     # Run Flask server
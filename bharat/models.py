@@ -11,6 +11,12 @@ class Metric(db.Model):
 
     __tablename__ = "metrics"
 
+    # Kept in sync with services/migrations.py
+    __table_args__ = (
+        db.Index("idx_metrics_target_id", "node_id", "service_id", "id"),
+        db.Index("idx_metrics_timestamp", "timestamp"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     timestamp = db.Column(db.String, nullable=False)
@@ -39,6 +45,15 @@ class Incident(db.Model):
 
     __tablename__ = "incidents"
 
+    # Kept in sync with services/migrations.py
+    __table_args__ = (
+        db.Index("idx_incidents_status_created", "status", "created_at"),
+        db.Index("idx_incidents_created", "created_at"),
+        db.Index("idx_incidents_fingerprint_status", "fingerprint", "status"),
+        db.Index("idx_incidents_status_id", "status", "id"),
+        db.Index("idx_incidents_target_id", "node_id", "service_id", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     service_id = db.Column(db.Integer, nullable=False)
@@ -54,6 +69,12 @@ class Incident(db.Model):
     # IMPORTANT — used by resolve_incident()
     resolved_at = db.Column(db.String, nullable=True)
 
+    # Deduplication: one OPEN incident per (node, service, cause)
+    cause = db.Column(db.String(50))
+    fingerprint = db.Column(db.String(100))
+    occurrences = db.Column(db.Integer, default=1)
+    last_seen_at = db.Column(db.String, nullable=True)
+
     def __repr__(self):
         return (
             f"<Incident id={self.id} "
@@ -1,5 +1,27 @@
-from flask import Blueprint, jsonify
-from bharat.services.database import get_recent_metrics, get_connection
+import json
+import queue
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, jsonify, request
+from bharat.services.database import (
+    get_recent_metrics,
+    get_cursor,
+    get_risk_history,
+    query_incidents
+)
+from bharat.services.metrics_query import query_metrics, parse_time
+from bharat.services.event_bus import subscribe, unsubscribe
+from bharat.services.dashboard_cache import get_snapshot, current_etag
+from bharat.services.risk_state import get_latest_risk
+from bharat.services.incident_service import compute_mttr
+from bharat.services.engine_process import engine_stats, engine_status
+from bharat.services.config import (
+    STREAM_KEEPALIVE,
+    STREAM_EVENTS,
+    DEFAULT_NODE_ID,
+    DEFAULT_SERVICE_ID,
+    INCIDENT_PAGE_SIZE
+)
 
 monitoring_bp = Blueprint("monitoring", __name__)
 
@@ -7,46 +29,78 @@ monitoring_bp = Blueprint("monitoring", __name__)
 # =========================================================
 # GET /risk/current
 # =========================================================
-@monitoring_bp.route("/risk/current", methods=["GET"])
-def get_current_risk():
-
-    conn = get_connection()
-    cursor = conn.cursor()
+def current_risk_payload():
 
-    cursor.execute("""
-        SELECT root_cause, severity, created_at
-        FROM incidents
-        ORDER BY id DESC
-        LIMIT 1
-    """)
+    with get_cursor() as cursor:
+        cursor.execute("""
+            SELECT root_cause, severity, created_at
+            FROM incidents
+            ORDER BY id DESC
+            LIMIT 1
+        """)
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     if not row:
-        return jsonify({
+        return {
             "risk": 0,
             "severity": "LOW",
             "message": "No incidents detected"
-        })
+        }
 
-    return jsonify({
+    return {
         "latest_incident": row[0],
         "severity": row[1],
         "timestamp": row[2]
-    })
+    }
+
+
+@monitoring_bp.route("/risk/current", methods=["GET"])
+def get_current_risk():
+    return jsonify(current_risk_payload())
 
 
 # =========================================================
-# GET /health
+# GET /risk/latest (in memory, no DB hit)
 # =========================================================
-@monitoring_bp.route("/health", methods=["GET"])
-def get_health():
+@monitoring_bp.route("/risk/latest", methods=["GET"])
+def get_latest_risk_state():
+
+    node_id = request.args.get("node_id", type=int)
+    service_id = request.args.get("service_id", type=int)
+
+    latest = get_latest_risk(node_id, service_id)
 
-    metrics = get_recent_metrics(1)
+    if latest is None:
+        return jsonify({"error": "No risk computed for this target yet"}), 404
+
+    return jsonify(latest)
+
+
+# =========================================================
+# GET /risk/history
+# =========================================================
+@monitoring_bp.route("/risk/history", methods=["GET"])
+def get_risk_trend():
+
+    args = request.args
+
+    history = get_risk_history(
+        node_id=args.get("node_id", DEFAULT_NODE_ID, type=int),
+        service_id=args.get("service_id", DEFAULT_SERVICE_ID, type=int),
+        limit=max(1, min(args.get("limit", 100, type=int), 1000))
+    )
+
+    return jsonify(history)
+
+
+# =========================================================
+# GET /health
+# =========================================================
+def health_payload(metrics):
 
     if not metrics:
-        return jsonify({"health": "UNKNOWN"})
+        return {"health": "UNKNOWN"}
 
     cpu = metrics[0][0]
 
@@ -59,19 +113,21 @@ def get_health():
     else:
         status = "CRITICAL"
 
-    return jsonify({
+    return {
         "health_score": health_score,
         "status": status
-    })
+    }
+
+
+@monitoring_bp.route("/health", methods=["GET"])
+def get_health():
+    return jsonify(health_payload(get_recent_metrics(1)))
 
 
 # =========================================================
 # GET /metrics/recent
 # =========================================================
-@monitoring_bp.route("/metrics/recent", methods=["GET"])
-def get_metrics():
-
-    metrics = get_recent_metrics(20)
+def recent_metrics_payload(metrics):
 
     data = []
 
@@ -84,27 +140,55 @@ def get_metrics():
             "error_rate": m[4]
         })
 
+    return data
+
+
+@monitoring_bp.route("/metrics/recent", methods=["GET"])
+def get_metrics():
+    return jsonify(recent_metrics_payload(get_recent_metrics(20)))
+
+
+# =========================================================
+# GET /metrics/query
+# =========================================================
+@monitoring_bp.route("/metrics/query", methods=["GET"])
+def query_metrics_range():
+
+    args = request.args
+
+    try:
+        end = parse_time(args.get("end"), datetime.utcnow())
+        start = parse_time(args.get("start"), end - timedelta(hours=1))
+
+        data = query_metrics(
+            start=start,
+            end=end,
+            step=float(args.get("step", 60)),
+            agg=args.get("agg", "mean"),
+            node_id=args.get("node_id", type=int),
+            service_id=args.get("service_id", type=int)
+        )
+
+    except (ValueError, TypeError, OverflowError, OSError) as e:
+        return jsonify({"error": str(e)}), 400
+
     return jsonify(data)
 
 
 # =========================================================
 # GET /incidents
 # =========================================================
-@monitoring_bp.route("/incidents", methods=["GET"])
-def get_incidents():
+def recent_incidents_payload():
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    with get_cursor() as cursor:
+        cursor.execute("""
+            SELECT id, severity, status, root_cause, created_at
+            FROM incidents
+            ORDER BY id DESC
+            LIMIT 20
+        """)
 
-    cursor.execute("""
-        SELECT id, severity, status, root_cause, created_at
-        FROM incidents
-        ORDER BY id DESC
-        LIMIT 20
-    """)
-
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
 
     incidents = []
 
@@ -117,4 +201,164 @@ def get_incidents():
             "created_at": r[4]
         })
 
-    return jsonify(incidents)
+    return incidents
+
+
+@monitoring_bp.route("/incidents", methods=["GET"])
+def get_incidents():
+
+    # Bare list, as the dashboard clients expect
+    return jsonify(recent_incidents_payload())
+
+
+# =========================================================
+# GET /incidents/search (filtered, keyset-paginated)
+# =========================================================
+@monitoring_bp.route("/incidents/search", methods=["GET"])
+def search_incidents():
+
+    args = request.args
+
+    try:
+        since = parse_time(args.get("since"), None)
+        until = parse_time(args.get("until"), None)
+
+    except (ValueError, TypeError, OverflowError, OSError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    page = query_incidents(
+        status=args.get("status"),
+        severity=args.get("severity"),
+        node_id=args.get("node_id", type=int),
+        service_id=args.get("service_id", type=int),
+        since=since.isoformat() if since else None,
+        until=until.isoformat() if until else None,
+        cursor=args.get("cursor", type=int),
+        limit=args.get("limit", INCIDENT_PAGE_SIZE, type=int)
+    )
+
+    return jsonify(page)
+
+
+# =========================================================
+# GET /incidents/mttr
+# =========================================================
+@monitoring_bp.route("/incidents/mttr", methods=["GET"])
+def get_mttr():
+
+    since_hours = request.args.get("hours", type=float)
+
+    return jsonify(compute_mttr(since_hours))
+
+
+# =========================================================
+# GET /dashboard/snapshot
+# =========================================================
+def _build_snapshot():
+
+    # One metrics read serves both health and the chart
+    metrics = get_recent_metrics(20)
+
+    return {
+        "health": health_payload(metrics[:1]),
+        "risk": current_risk_payload(),
+        "metrics": recent_metrics_payload(metrics),
+        "incidents": recent_incidents_payload()
+    }
+
+
+@monitoring_bp.route("/dashboard/snapshot", methods=["GET"])
+def get_dashboard_snapshot():
+
+    # Cheap check first: no rebuild needed to answer a 304
+    etag = current_etag()
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        snapshot, etag = get_snapshot(_build_snapshot)
+        response = jsonify(snapshot)
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+
+    return response
+
+
+# =========================================================
+# GET /stream (Server-Sent Events)
+# =========================================================
+@monitoring_bp.route("/stream", methods=["GET"])
+def stream_events():
+
+    def generate():
+
+        events = subscribe(events=STREAM_EVENTS)
+
+        try:
+            # Client reconnect delay (ms)
+            yield "retry: 3000\n\n"
+
+            while True:
+
+                try:
+                    event, data = events.get(timeout=STREAM_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                payload = json.dumps(data, default=str)
+                yield f"event: {event}\ndata: {payload}\n\n"
+
+        finally:
+            unsubscribe(events)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+# =========================================================
+# GET /remediation/status
+# =========================================================
+# Served from the engine's latest stats snapshot, which lives in
+# the worker process when ENGINE_MODE is "process"
+@monitoring_bp.route("/remediation/status", methods=["GET"])
+def get_remediation_status():
+    return jsonify(engine_stats().get("remediation", {}))
+
+
+# =========================================================
+# GET /ml/status
+# =========================================================
+@monitoring_bp.route("/ml/status", methods=["GET"])
+def get_ml_status():
+
+    stats = engine_stats()
+
+    return jsonify({
+        "anomaly_model": stats.get("anomaly_model"),
+        "streaming_gate": stats.get("streaming_gate"),
+        "training": stats.get("training"),
+        "import_ms": stats.get("import_ms")
+    })
+
+
+# =========================================================
+# GET /engine/status
+# =========================================================
+@monitoring_bp.route("/engine/status", methods=["GET"])
+def get_engine_status():
+
+    stats = engine_stats()
+
+    return jsonify({
+        **engine_status(),
+        "ingestion": stats.get("ingestion"),
+        "stats_at": stats.get("timestamp")
+    })
@@ -0,0 +1,197 @@
+import logging
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from bharat.services.target_registry import get_target
+from bharat.services.config import (
+    REMEDIATION_BACKEND,
+    REMEDIATION_COMMANDS,
+    REMEDIATION_COMMAND_TIMEOUT,
+    REMEDIATION_OUTPUT_LIMIT
+)
+
+
+logger = logging.getLogger("ACTIONS")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Action Backend Interface
+# =========================================================
+class ActionBackend(ABC):
+    """
+    Executes one remediation action against a target.
+
+    ``run`` blocks until the action finishes and returns a result
+    dict with at least ``action``, ``status`` and ``duration_ms``.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def run(self, action, service_id, node_id, **params):
+        pass
+
+    def _result(self, action, status, service_id, node_id, started, **extra):
+
+        return {
+            "action": action,
+            "status": status,
+            "backend": self.name,
+            "service_id": service_id,
+            "node_id": node_id,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "timestamp": datetime.utcnow().isoformat(),
+            **extra
+        }
+
+
+# =========================================================
+# Dry Run (log only)
+# =========================================================
+class DryRunBackend(ActionBackend):
+
+    name = "dry_run"
+
+    def run(self, action, service_id, node_id, **params):
+
+        started = time.perf_counter()
+
+        logger.info(
+            f"[dry run] {action} service {service_id} on node {node_id} {params or ''}"
+        )
+
+        return self._result(
+            action, "success", service_id, node_id, started,
+            dry_run=True, **params
+        )
+
+
+# =========================================================
+# Local Command Runner
+# =========================================================
+def _truncate(text):
+
+    if text is None:
+        return ""
+
+    if isinstance(text, bytes):
+        text = text.decode(errors="replace")
+
+    return text[-REMEDIATION_OUTPUT_LIMIT:]
+
+
+class CommandBackend(ActionBackend):
+
+    name = "command"
+
+    def __init__(self, commands=None, timeout=REMEDIATION_COMMAND_TIMEOUT):
+
+        self.commands = {**REMEDIATION_COMMANDS, **(commands or {})}
+        self.timeout = timeout
+
+    def run(self, action, service_id, node_id, **params):
+
+        started = time.perf_counter()
+
+        template = self.commands.get(action)
+
+        if template is None:
+            return self._result(
+                action, "failed", service_id, node_id, started,
+                error=f"No command configured for {action}"
+            )
+
+        values = {"node_id": node_id, "service_id": service_id, **params}
+        argv = [part.format(**values) for part in template]
+
+        try:
+            # No shell: argv is passed straight to exec
+            proc = subprocess.run(
+                argv,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+
+        except subprocess.TimeoutExpired as e:
+            logger.error(f"{action} timed out after {self.timeout}s: {argv}")
+
+            return self._result(
+                action, "timeout", service_id, node_id, started,
+                command=argv,
+                stdout=_truncate(e.stdout),
+                stderr=_truncate(e.stderr)
+            )
+
+        except OSError as e:
+            logger.error(f"{action} could not start: {e}")
+
+            return self._result(
+                action, "failed", service_id, node_id, started,
+                command=argv,
+                error=str(e)
+            )
+
+        status = "success" if proc.returncode == 0 else "failed"
+
+        if status == "failed":
+            logger.warning(f"{action} exited with {proc.returncode}: {argv}")
+
+        return self._result(
+            action, status, service_id, node_id, started,
+            command=argv,
+            returncode=proc.returncode,
+            stdout=_truncate(proc.stdout),
+            stderr=_truncate(proc.stderr)
+        )
+
+
+ACTION_BACKENDS = {
+    DryRunBackend.name: DryRunBackend,
+    CommandBackend.name: CommandBackend
+}
+
+
+# =========================================================
+# Per-Target Backend Cache
+# =========================================================
+# (node_id, service_id) -> ((backend name, commands), backend)
+_backends = {}
+
+
+def _backend_config(node_id, service_id):
+
+    target = get_target(node_id, service_id) or {}
+
+    return target.get("backend") or REMEDIATION_BACKEND, target.get("commands")
+
+
+def _create_backend(name, commands):
+
+    if name not in ACTION_BACKENDS:
+        logger.warning(f"Unknown action backend {name!r}, using dry run")
+        return DryRunBackend()
+
+    if name == CommandBackend.name:
+        return CommandBackend(commands)
+
+    return ACTION_BACKENDS[name]()
+
+
+def get_backend(node_id, service_id):
+
+    key = (node_id, service_id)
+    config = _backend_config(node_id, service_id)
+
+    cached = _backends.get(key)
+
+    # Rebuilt when the target is re-registered with another
+    # backend or command set
+    if cached is None or cached[0] != config:
+        cached = (config, _create_backend(*config))
+        _backends[key] = cached
+
+    return cached[1]
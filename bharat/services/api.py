@@ -1,15 +1,32 @@
 # services/api.py
 
-from fastapi import FastAPI
+import time
+from typing import Optional
+
+_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query
 from bharat.services.metrics_services import collect_metrics, simulate_cpu_spike
-from bharat.services.scheduler_service import start_scheduler
-from bharat.services.database import get_incidents
+from bharat.services.engine_process import start_engine
+from bharat.services.database import query_incidents
+from bharat.services.metrics_query import parse_time
 from bharat.services.health_service import get_system_health
-import threading
+from bharat.services.migrations import run_migrations
+from bharat.services.lazy_imports import print_startup_report
+from bharat.services.config import INCIDENT_PAGE_SIZE, INCIDENT_PAGE_MAX
 
 app = FastAPI(title="SentinelOps API")
 
 
+# -----------------------------
+# Schema Migrations
+# -----------------------------
+@app.on_event("startup")
+def migrate():
+    run_migrations()
+    print_startup_report("SentinelOps API", _started)
+
+
 # -----------------------------
 # Health Check
 # -----------------------------
@@ -31,8 +48,33 @@ def metrics():
 # Get Incidents
 # -----------------------------
 @app.get("/incidents")
-def incidents():
-    return {"incidents": get_incidents()}
+def incidents(
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    node_id: Optional[int] = None,
+    service_id: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(INCIDENT_PAGE_SIZE, ge=1, le=INCIDENT_PAGE_MAX)
+):
+    try:
+        since = parse_time(since, None)
+        until = parse_time(until, None)
+
+    except (ValueError, TypeError, OverflowError, OSError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return query_incidents(
+        status=status,
+        severity=severity,
+        node_id=node_id,
+        service_id=service_id,
+        since=since.isoformat() if since else None,
+        until=until.isoformat() if until else None,
+        cursor=cursor,
+        limit=limit
+    )
 
 
 # -----------------------------
@@ -49,6 +91,6 @@ def simulate_spike():
 # -----------------------------
 @app.post("/run-once")
 def run_once():
-    thread = threading.Thread(target=start_scheduler, daemon=True)
-    thread.start()
+    if not start_engine():
+        return {"message": "Monitoring loop already running"}
     return {"message": "Monitoring loop started in background"}
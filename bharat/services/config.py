@@ -15,11 +15,112 @@ BASE_DIR = os.path.abspath(
 # Single source of truth for the DB path
 DB_PATH = os.path.join(BASE_DIR, "sentinelops.db")
 
+# =========================================================
+# SQLite Tuning
+# =========================================================
+DB_POOL_SIZE = 4                    # idle connections kept open
+DB_JOURNAL_MODE = "WAL"             # readers no longer block the writer
+DB_SYNCHRONOUS = "NORMAL"           # safe with WAL, far fewer fsyncs
+DB_MMAP_SIZE = 64 * 1024 * 1024     # bytes
+DB_CACHE_SIZE = -16000              # negative = KiB (≈16 MB per connection)
+DB_BUSY_TIMEOUT = 5.0               # seconds to wait on a locked DB
+DB_STATEMENT_CACHE = 128            # prepared statements kept per connection
+
+# =========================================================
+# Metric Ingestion (write-behind)
+# =========================================================
+INGEST_BATCH_SIZE = 200          # rows per transaction
+INGEST_FLUSH_INTERVAL = 1.0      # max seconds a row waits in memory
+INGEST_QUEUE_MAX = 10000         # buffered rows before backpressure
+INGEST_PUT_TIMEOUT = 2.0         # seconds a producer blocks when full
+INGEST_WRITE_RETRIES = 3         # retries of a batch hitting a locked DB
+INGEST_RETRY_BACKOFF = 0.5       # first retry delay (s), doubled each time;
+                                 # total must stay under ROLLUP_LATENESS_SECONDS
+
+# =========================================================
+# Retention & Rollups
+# =========================================================
+RAW_RETENTION_HOURS = 24           # raw samples kept
+ROLLUP_1M_RETENTION_DAYS = 30      # 1-minute aggregates kept
+ROLLUP_1H_RETENTION_DAYS = 365     # 1-hour aggregates kept
+RETENTION_JOB_INTERVAL = 60        # seconds between compaction passes
+ROLLUP_MAX_ROWS = 50000            # source rows read per tier per pass
+ROLLUP_LATENESS_SECONDS = 30       # > INGEST_FLUSH_INTERVAL + one collection
+                                   # interval, so late flushes still roll up
+RISK_HISTORY_RETENTION_DAYS = 30   # per-cycle risk scores kept
+REMEDIATION_RETENTION_DAYS = 90    # remediation action log kept
+VACUUM_INTERVAL_HOURS = 24
+
+# =========================================================
+# Metrics Query API
+# =========================================================
+QUERY_MAX_BUCKETS = 1500           # buckets returned per query
+QUERY_RAW_MAX_SPAN_HOURS = 6       # longer ranges read a rollup tier
+
 # =========================================================
 # Scheduler Configuration
 # =========================================================
 METRIC_COLLECTION_INTERVAL = 5  # seconds
 
+# =========================================================
+# CPU Sampler
+# =========================================================
+# Delta window (seconds) of the background CPU sampler;
+# collect_metrics() reads the latest completed window
+CPU_SAMPLE_INTERVAL = 1.0
+
+# =========================================================
+# Default Target (prototype single node / service)
+# =========================================================
+DEFAULT_NODE_ID = 1
+DEFAULT_SERVICE_ID = 1
+
+# =========================================================
+# Monitored Targets
+# =========================================================
+# Each entry may override the collection interval (seconds)
+MONITORED_TARGETS = [
+    {"node_id": DEFAULT_NODE_ID, "service_id": DEFAULT_SERVICE_ID}
+]
+
+# Upper bound on targets processed concurrently
+SCHEDULER_MAX_WORKERS = 8
+
+# Random delay (seconds) spreading the first cycle of each target
+SCHEDULER_START_JITTER = 2.0
+
+# Seconds batch scoring waits for a tick's collections; stragglers
+# are scored as they arrive instead of holding up the batch
+SCHEDULER_BATCH_WAIT = 1.0
+
+# =========================================================
+# In-Memory Metric Window
+# =========================================================
+# Samples kept per (node_id, service_id) ring buffer.
+# Must cover the largest consumer window (risk warm-up).
+METRIC_WINDOW_SIZE = 360
+
+# =========================================================
+# Monitoring Engine Process
+# =========================================================
+# "process": scheduler runs in a supervised worker process and
+# its events are relayed to the web process; "thread": in-process
+ENGINE_MODE = "process"
+ENGINE_RESTART_BACKOFF = 2.0       # first restart delay (seconds)
+ENGINE_RESTART_MAX_BACKOFF = 60.0  # cap for the doubling delay
+ENGINE_HEALTHY_SECONDS = 60        # uptime that resets the backoff
+ENGINE_RELAY_QUEUE_MAX = 10000     # events buffered between processes
+ENGINE_STATS_INTERVAL = 5          # seconds between stats snapshots
+
+# =========================================================
+# Dashboard Event Stream (SSE)
+# =========================================================
+STREAM_QUEUE_MAX = 500         # buffered events per subscriber
+STREAM_KEEPALIVE = 15          # seconds between keep-alive comments
+# Bus events forwarded to dashboard clients; internal ones
+# (metrics_flushed, remediation, ...) stay in-process
+STREAM_EVENTS = ("metrics", "incident", "incident_resolved")
+
 # =========================================================
 # Resource Thresholds
 # =========================================================
@@ -35,16 +136,111 @@ ERROR_CRITICAL = 0.1
 # =========================================================
 SUSTAINED_COUNT = 3
 
+# =========================================================
+# Anomaly Model Lifecycle
+# =========================================================
+# Retrain policy: "time", "samples" or "drift"
+ANOMALY_RETRAIN_POLICY = "time"
+ANOMALY_RETRAIN_INTERVAL = 300     # seconds since last fit
+ANOMALY_RETRAIN_SAMPLES = 120      # new samples since last fit
+ANOMALY_DRIFT_THRESHOLD = 3.0      # recent mean shift, in training std units
+ANOMALY_DRIFT_WINDOW = 12          # samples compared against training stats
+ANOMALY_TRAINING_SAMPLES = 200
+ANOMALY_MIN_SAMPLES = 50
+
+# Share of training samples the Isolation Forest treats as outliers
+ANOMALY_CONTAMINATION = 0.05
+
+# Calibrated score = share of training samples that looked more
+# normal than this one (0 = very normal, 1 = beyond anything seen).
+# The baseline is the model's own decision boundary: at or below it
+# a sample adds no risk, above it risk ramps up to ANOMALY_RISK_WEIGHT.
+ANOMALY_SCORE_BASELINE = 1 - ANOMALY_CONTAMINATION
+ANOMALY_RISK_WEIGHT = 20
+
+# =========================================================
+# Streaming Statistical Detector (first-line filter)
+# =========================================================
+# ML only runs for samples the running stats flag
+STATS_GATE_ENABLED = True
+STATS_EWMA_ALPHA = 0.1           # EWMA smoothing factor
+STATS_ROLLING_WINDOW = 60        # Welford window in samples (0 = all history)
+STATS_Z_THRESHOLD = 4.0          # |z| that flags a sample
+STATS_MIN_SAMPLES = 30           # flag everything until stats settle
+STATS_REL_STD_FLOOR = 0.01       # std floor as a share of the mean
+
+# =========================================================
+# Model Training
+# =========================================================
+# "process": fits run in a process pool while the current model
+# keeps serving; "inline": fit on the calling thread
+TRAINING_MODE = "process"
+TRAINING_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+TRAINING_TIMEOUT = 120             # seconds before a fit is abandoned
+
+# =========================================================
+# Per-Target Model Registry
+# =========================================================
+# Models are keyed by (node_id, service_id, metric); the least
+# recently used are evicted past either bound and retrained or
+# reloaded from disk on next demand
+MODEL_REGISTRY_MAX_ENTRIES = 256
+MODEL_REGISTRY_MAX_MB = 512
+
+# =========================================================
+# Model Persistence (warm start across restarts)
+# =========================================================
+MODEL_PERSIST = True
+MODEL_DIR = os.path.join(BASE_DIR, "model_store")
+MODEL_MAX_AGE_HOURS = 24           # older saved models are ignored
+MODEL_FORMAT_VERSION = 1           # bump when the saved layout changes
+
+# =========================================================
+# Incident Lifecycle
+# =========================================================
+INCIDENT_RECOVERY_SECONDS = 60     # quiet time before auto-resolve
+INCIDENT_TOUCH_INTERVAL = 30       # seconds between occurrence-count writes
+INCIDENT_PAGE_SIZE = 50            # default incidents per API page
+INCIDENT_PAGE_MAX = 200            # hard cap on page size
+
 # =========================================================
 # Forecast Configuration
 # =========================================================
-FORECAST_WINDOW = 30
+# Backend: "holt" (incremental) or "prophet" (optional, heavy)
+FORECAST_BACKEND = "holt"
+FORECAST_WINDOW = 30           # horizon, in samples
+FORECAST_MIN_SAMPLES = 30
+FORECAST_ALPHA = 0.3           # Holt level smoothing
+FORECAST_BETA = 0.1            # Holt trend smoothing
+FORECAST_ROLLUP_POINTS = 720   # 1-minute buckets Prophet trains on
 
 # =========================================================
 # Remediation Configuration
 # =========================================================
 DEFAULT_SCALE_REPLICAS = 2
 
+REMEDIATION_WORKERS = 4            # actions executed in parallel
+REMEDIATION_MAX_IN_FLIGHT = 16     # queued + running actions, globally
+REMEDIATION_COOLDOWN = 120         # seconds between actions on one target
+REMEDIATION_RATE_LIMIT = 30        # actions started per minute, globally
+REMEDIATION_THROTTLE_RETRY = 5     # seconds before a max-in-flight refusal is retried
+
+# Action backend: "dry_run" (log only) or "command" (run a local
+# command). Targets can override it with a "backend" key in
+# MONITORED_TARGETS, and the command table with "commands".
+REMEDIATION_BACKEND = "dry_run"
+
+# argv templates per action; {node_id}, {service_id} and
+# {replicas} are filled in per call
+REMEDIATION_COMMANDS = {
+    "restart_service": ["systemctl", "restart", "sentinel-svc-{service_id}"],
+    "scale_service": ["systemctl", "start", "sentinel-svc-{service_id}@{replicas}"],
+    "emergency_shutdown": ["systemctl", "stop", "sentinel-svc-{service_id}"]
+}
+
+REMEDIATION_COMMAND_TIMEOUT = 30   # seconds before a command is killed
+REMEDIATION_OUTPUT_LIMIT = 4000    # chars of stdout/stderr kept per action
+
 # =========================================================
 # System Metadata
 # =========================================================
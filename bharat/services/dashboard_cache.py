@@ -0,0 +1,80 @@
+import threading
+import time
+
+from bharat.services.event_bus import add_listener
+
+
+# =========================================================
+# Events that change what the dashboard shows
+# =========================================================
+INVALIDATING_EVENTS = {
+    "metrics_flushed",
+    "incident",
+    "incident_resolved"
+}
+
+
+# =========================================================
+# Snapshot Cache
+# =========================================================
+# The version only ever moves forward; the boot token keeps
+# ETags from colliding across restarts.
+_boot = int(time.time())
+
+_state = {
+    "version": 0,
+    "built_version": None,
+    "snapshot": None
+}
+
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+
+def invalidate():
+
+    with _lock:
+        _state["version"] += 1
+
+
+def current_etag():
+
+    with _lock:
+        return f"{_boot}-{_state['version']}"
+
+
+def get_snapshot(builder):
+    """
+    Return (snapshot, etag), calling ``builder()`` only when
+    something has been written since the last build.
+    """
+
+    with _lock:
+        version = _state["version"]
+
+        if _state["built_version"] == version:
+            return _state["snapshot"], f"{_boot}-{version}"
+
+    # One rebuild at a time; concurrent callers reuse it
+    with _build_lock:
+
+        with _lock:
+            if _state["built_version"] == version:
+                return _state["snapshot"], f"{_boot}-{version}"
+
+        snapshot = builder()
+
+        with _lock:
+            _state["snapshot"] = snapshot
+            _state["built_version"] = version
+
+    return snapshot, f"{_boot}-{version}"
+
+
+def _on_event(event, data):
+
+    if event in INVALIDATING_EVENTS:
+        invalidate()
+
+
+add_listener(_on_event)
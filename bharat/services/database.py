@@ -1,63 +1,205 @@
+import queue
 import sqlite3
 from contextlib import contextmanager
-from bharat.services.config import DB_PATH
+from bharat.services.config import (
+    DB_PATH,
+    INCIDENT_PAGE_SIZE,
+    INCIDENT_PAGE_MAX,
+    DB_POOL_SIZE,
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_MMAP_SIZE,
+    DB_CACHE_SIZE,
+    DB_BUSY_TIMEOUT,
+    DB_STATEMENT_CACHE
+)
+
+# =========================================================
+# Metric Value Columns (shared by raw and rollup tables)
+# =========================================================
+METRIC_COLUMNS = (
+    "cpu_usage",
+    "memory_usage",
+    "disk_usage",
+    "response_time_ms",
+    "error_rate"
+)
+
 
 # =========================================================
 # Connection Helper
 # =========================================================
 def get_connection():
+    """Open a new tuned connection. The caller must close it."""
 
     conn = sqlite3.connect(
         DB_PATH,
-        check_same_thread=False
+        check_same_thread=False,
+        timeout=DB_BUSY_TIMEOUT,
+        cached_statements=DB_STATEMENT_CACHE
     )
 
+    conn.execute(f"PRAGMA journal_mode={DB_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA mmap_size={int(DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size={int(DB_CACHE_SIZE)}")
+
     conn.row_factory = sqlite3.Row
     return conn
 
 
 # =========================================================
-# Cursor Context Manager
+# Connection Pool
 # =========================================================
+# Reusing connections keeps each one's page cache and
+# prepared-statement cache warm across calls.
+_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+
 @contextmanager
-def get_cursor():
+def pooled_connection():
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = get_connection()
 
     try:
-        yield cursor
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
+        yield conn
+
     finally:
-        conn.close()
+        if conn.in_transaction:
+            conn.rollback()
+
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def close_pool():
+
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+# =========================================================
+# Cursor Context Manager
+# =========================================================
+@contextmanager
+def get_cursor():
+
+    with pooled_connection() as conn:
+
+        cursor = conn.cursor()
+
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
 
 
 # =========================================================
 # Insert Metrics
 # =========================================================
+INSERT_METRICS_SQL = """
+    INSERT INTO metrics (
+        timestamp, node_id, service_id,
+        cpu_usage, memory_usage, disk_usage,
+        response_time_ms, error_rate
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def metric_row(metrics: dict):
+
+    return (
+        metrics["timestamp"],
+        metrics["node_id"],
+        metrics["service_id"],
+        metrics["cpu_usage"],
+        metrics["memory_usage"],
+        metrics["disk_usage"],
+        metrics["response_time_ms"],
+        metrics["error_rate"]
+    )
+
+
 def insert_metrics(metrics: dict):
 
     with get_cursor() as cursor:
-        cursor.execute("""
-            INSERT INTO metrics (
-                timestamp, node_id, service_id,
-                cpu_usage, memory_usage, disk_usage,
-                response_time_ms, error_rate
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            metrics["timestamp"],
-            metrics["node_id"],
-            metrics["service_id"],
-            metrics["cpu_usage"],
-            metrics["memory_usage"],
-            metrics["disk_usage"],
-            metrics["response_time_ms"],
-            metrics["error_rate"]
-        ))
+        cursor.execute(INSERT_METRICS_SQL, metric_row(metrics))
+
+
+# =========================================================
+# Insert Metrics (batch, single transaction)
+# =========================================================
+def insert_metrics_batch(rows):
+
+    with get_cursor() as cursor:
+        cursor.executemany(INSERT_METRICS_SQL, rows)
+
+
+# =========================================================
+# Risk History
+# =========================================================
+RISK_COLUMNS = (
+    "timestamp",
+    "node_id",
+    "service_id",
+    "risk",
+    "severity",
+    "future_cpu",
+    "eta_minutes",
+    "anomaly",
+    "warmup"
+)
+
+INSERT_RISK_SQL = f"""
+    INSERT INTO risk_history ({", ".join(RISK_COLUMNS)})
+    VALUES ({", ".join("?" * len(RISK_COLUMNS))})
+"""
+
+
+def risk_row(record: dict):
+    return tuple(record.get(name) for name in RISK_COLUMNS)
+
+
+def get_risk_history(node_id, service_id, limit=100):
+
+    with get_cursor() as cursor:
+        cursor.execute(f"""
+            SELECT {", ".join(RISK_COLUMNS)}
+            FROM risk_history
+            WHERE node_id = ? AND service_id = ?
+            ORDER BY id DESC
+            LIMIT ?
+        """, (node_id, service_id, limit))
+
+        rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
+
+# =========================================================
+# Ingest Batch (metrics + risk in one transaction)
+# =========================================================
+def insert_ingest_batch(metric_rows, risk_rows):
+
+    with get_cursor() as cursor:
+
+        if metric_rows:
+            cursor.executemany(INSERT_METRICS_SQL, metric_rows)
+
+        if risk_rows:
+            cursor.executemany(INSERT_RISK_SQL, risk_rows)
 
 
 # =========================================================
@@ -78,6 +220,64 @@ def get_recent_metrics(limit=50):
         return [tuple(row) for row in rows]
 
 
+# =========================================================
+# Fetch Recent Metrics (single target)
+# =========================================================
+def get_recent_metrics_for_target(node_id, service_id, limit=50):
+
+    with get_cursor() as cursor:
+        cursor.execute("""
+            SELECT cpu_usage, memory_usage, disk_usage,
+                   response_time_ms, error_rate
+            FROM metrics
+            WHERE node_id = ? AND service_id = ?
+            ORDER BY id DESC
+            LIMIT ?
+        """, (node_id, service_id, limit))
+
+        rows = cursor.fetchall()
+        return [tuple(row) for row in rows]
+
+
+# =========================================================
+# Fetch Rollup Tier (single target)
+# =========================================================
+ROLLUP_TABLES = {"1m": "metrics_1m", "1h": "metrics_1h"}
+
+
+def get_metric_rollups(tier, node_id, service_id, limit=60, stat="mean"):
+
+    table = ROLLUP_TABLES[tier]
+    columns = ", ".join(f"{c}_{stat}" for c in METRIC_COLUMNS)
+
+    with get_cursor() as cursor:
+        cursor.execute(f"""
+            SELECT bucket, samples, {columns}
+            FROM {table}
+            WHERE node_id = ? AND service_id = ?
+            ORDER BY bucket DESC
+            LIMIT ?
+        """, (node_id, service_id, limit))
+
+        rows = cursor.fetchall()
+        return [tuple(row) for row in rows]
+
+
+# =========================================================
+# Known Metric Targets
+# =========================================================
+def get_metric_targets():
+
+    with get_cursor() as cursor:
+        cursor.execute("""
+            SELECT DISTINCT node_id, service_id
+            FROM metrics
+        """)
+
+        rows = cursor.fetchall()
+        return [tuple(row) for row in rows]
+
+
 # =========================================================
 # Insert Incident
 # =========================================================
@@ -101,13 +301,85 @@ def insert_incident(created_at, status, severity, service_id, node_id, root_caus
 # =========================================================
 # Fetch Incidents
 # =========================================================
-def get_incidents():
+def get_incidents(limit=INCIDENT_PAGE_SIZE):
 
     with get_cursor() as cursor:
         cursor.execute("""
             SELECT id, severity, status, root_cause, created_at FROM incidents
             ORDER BY created_at DESC
-        """)
+            LIMIT ?
+        """, (min(limit, INCIDENT_PAGE_MAX),))
 
         rows = cursor.fetchall()
         return [dict(row) for row in rows]
+
+
+# =========================================================
+# Query Incidents (filtered, keyset-paginated)
+# =========================================================
+INCIDENT_FIELDS = (
+    "id", "severity", "status", "service_id", "node_id",
+    "root_cause", "cause", "occurrences",
+    "created_at", "last_seen_at", "resolved_at"
+)
+
+
+def query_incidents(status=None, severity=None, node_id=None,
+                    service_id=None, since=None, until=None,
+                    cursor=None, limit=INCIDENT_PAGE_SIZE):
+    """
+    Newest-first page of incidents. Pass the returned
+    ``next_cursor`` back as ``cursor`` to fetch the next page.
+    """
+
+    limit = max(1, min(int(limit or INCIDENT_PAGE_SIZE), INCIDENT_PAGE_MAX))
+
+    clauses = []
+    params = []
+
+    for column, value in (
+        ("status", status),
+        ("severity", severity),
+        ("node_id", node_id),
+        ("service_id", service_id)
+    ):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+
+    if since is not None:
+        clauses.append("created_at >= ?")
+        params.append(since)
+
+    if until is not None:
+        clauses.append("created_at < ?")
+        params.append(until)
+
+    if cursor is not None:
+        clauses.append("id < ?")
+        params.append(cursor)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    # One extra row tells us whether another page exists
+    params.append(limit + 1)
+
+    with get_cursor() as cur:
+        cur.execute(f"""
+            SELECT {", ".join(INCIDENT_FIELDS)}
+            FROM incidents
+            {where}
+            ORDER BY id DESC
+            LIMIT ?
+        """, params)
+
+        rows = [dict(row) for row in cur.fetchall()]
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "incidents": rows,
+        "next_cursor": rows[-1]["id"] if has_more else None,
+        "limit": limit
+    }
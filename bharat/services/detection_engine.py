@@ -1,18 +1,247 @@
-from bharat.services.incident_service import create_incident
+import threading
+from collections import deque
+
+import numpy as np
+
+from bharat.services.incident_service import record_incident, resolve_recovered
+from bharat.services.metric_window import get_window, FEATURES
 from bharat.services.risk_engine import (
     calculate_failure_probability,
     estimate_time_to_failure,
     sustained_cpu_high,
     HIGH_CPU,
-    CRITICAL_CPU
+    CRITICAL_CPU,
+    RISK_INCIDENT
+)
+from bharat.services.config import (
+    STATS_GATE_ENABLED,
+    STATS_EWMA_ALPHA,
+    STATS_ROLLING_WINDOW,
+    STATS_Z_THRESHOLD,
+    STATS_MIN_SAMPLES,
+    STATS_REL_STD_FLOOR
 )
 
 
-def analyze_metrics(metrics):
+# =========================================================
+# Streaming Statistical Detector
+# =========================================================
+class StreamingDetector:
+    """
+    O(1)-per-sample statistics for every metric of one target:
+    a Welford mean/variance over the last ``rolling`` samples
+    (all samples when 0) and an exponentially weighted mean/variance.
+
+    Each sample is z-scored against the stats *before* it is folded
+    in, so a spike cannot hide itself. Both baselines follow level
+    shifts, so a permanent change stops being flagged once absorbed.
+    """
+
+    def __init__(self, alpha=STATS_EWMA_ALPHA, rolling=STATS_ROLLING_WINDOW):
+
+        size = len(FEATURES)
+
+        self.alpha = alpha
+        self.rolling = rolling
+
+        # Welford (windowed when rolling > 0)
+        self.count = 0
+        self.mean = np.zeros(size)
+        self._m2 = np.zeros(size)
+        self._recent = deque()
+
+        # EWMA mean / variance
+        self.ewma = None
+        self.ewm_var = np.zeros(size)
+
+        self.seen = 0
+
+        self.last_timestamp = None
+        self.last = None
+
+        self.lock = threading.Lock()
+
+    def _std(self, variance, mean):
+        # Floor keeps near-constant metrics (e.g. disk) from exploding z
+        floor = STATS_REL_STD_FLOOR * np.abs(mean) + 1e-6
+        return np.maximum(np.sqrt(np.maximum(variance, 0)), floor)
+
+    def _zscores(self, x):
+
+        welford_std = self._std(self._m2 / (self.count - 1), self.mean)
+        ewm_std = self._std(self.ewm_var, self.ewma)
+
+        return np.maximum(
+            np.abs(x - self.mean) / welford_std,
+            np.abs(x - self.ewma) / ewm_std
+        )
+
+    def _add(self, x):
+
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    def _remove(self, x):
+
+        self.count -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self._m2 -= delta * (x - self.mean)
+
+    def update(self, x):
+
+        x = np.asarray(x, dtype=float)
+
+        warming = self.seen < STATS_MIN_SAMPLES
+
+        z = None if warming else self._zscores(x)
+
+        self.seen += 1
+
+        # Welford, dropping the oldest sample once the window is full
+        self._add(x)
+
+        if self.rolling:
+            self._recent.append(x)
+
+            if len(self._recent) > self.rolling:
+                self._remove(self._recent.popleft())
+
+        # EWMA mean / variance
+        if self.ewma is None:
+            self.ewma = x.copy()
+        else:
+            delta = x - self.ewma
+            self.ewma = self.ewma + self.alpha * delta
+            self.ewm_var = (1 - self.alpha) * (self.ewm_var + self.alpha * delta * delta)
+
+        if warming:
+            return {"flagged": True, "warming": True, "max_z": None, "metric": None}
+
+        worst = int(z.argmax())
+
+        return {
+            "flagged": bool(z[worst] >= STATS_Z_THRESHOLD),
+            "warming": False,
+            "max_z": round(float(z[worst]), 2),
+            "metric": FEATURES[worst]
+        }
+
+
+# =========================================================
+# Per-Target Detectors
+# =========================================================
+_detectors = {}
+_detectors_lock = threading.Lock()
+
+_gate_stats = {"observed": 0, "flagged": 0, "skipped": 0}
+_gate_lock = threading.Lock()
+
+
+def _get_detector(node_id, service_id):
+
+    key = (node_id, service_id)
+
+    detector = _detectors.get(key)
+
+    if detector is not None:
+        return detector
+
+    with _detectors_lock:
+
+        detector = _detectors.get(key)
+
+        if detector is None:
+            detector = StreamingDetector()
+
+            # Seed from history; the newest row is the sample being
+            # observed now, so it is left for observe()
+            for row in get_window(node_id, service_id).latest(copy=True)[:-1]:
+                detector.update(row)
+
+            _detectors[key] = detector
+
+    return detector
+
+
+def observe(metrics):
+    """
+    Fold one sample into its target's running stats and return
+    whether it stands out. Repeat calls for the same sample return
+    the first result.
+    """
+
+    detector = _get_detector(metrics["node_id"], metrics["service_id"])
+
+    with detector.lock:
+
+        if detector.last_timestamp == metrics["timestamp"]:
+            return detector.last
+
+        result = detector.update([metrics[name] for name in FEATURES])
+
+        detector.last_timestamp = metrics["timestamp"]
+        detector.last = result
+
+    with _gate_lock:
+        _gate_stats["observed"] += 1
+        _gate_stats["flagged" if result["flagged"] else "skipped"] += 1
+
+    return result
+
+
+def should_run_ml(metrics):
+
+    if not STATS_GATE_ENABLED:
+        return True
+
+    return observe(metrics)["flagged"]
+
+
+def streaming_stats():
+
+    with _gate_lock:
+        stats = dict(_gate_stats)
+
+    observed = stats["observed"]
+
+    return {
+        "enabled": STATS_GATE_ENABLED,
+        "targets": len(_detectors),
+        **stats,
+        "ml_skip_rate": (
+            round(stats["skipped"] / observed, 3) if observed else None
+        )
+    }
+
+
+def analyze_metrics(metrics, anomaly=None):
+
+    # Cheap running stats decide whether the ML models run at all
+    result = _evaluate(metrics, anomaly, run_ml=should_run_ml(metrics))
+
+    # =====================================================
+    # Incident lifecycle: resolve causes that have cleared
+    # =====================================================
+    active = (result["cause"],) if result.get("anomaly") else ()
+
+    resolve_recovered(metrics["node_id"], metrics["service_id"], active)
+
+    return result
+
+
+def _evaluate(metrics, anomaly=None, run_ml=True):
 
     cpu = metrics["cpu_usage"]
 
-    risk, future_cpu, progress, warming = calculate_failure_probability(metrics)
+    risk, future_cpu, progress, warming, anomaly = (
+        calculate_failure_probability(metrics, anomaly, run_ml)
+    )
+
+    anomaly_score = anomaly["calibrated"] if anomaly is not None else None
+    contributions = anomaly["contributions"] if anomaly is not None else None
 
     # =====================================================
     # WARM-UP MODE
@@ -32,9 +261,10 @@ def analyze_metrics(metrics):
     # =====================================================
     if cpu >= CRITICAL_CPU:
 
-        incident_id = create_incident(
+        incident_id, incident_state = record_incident(
             service_id=metrics["service_id"],
             node_id=metrics["node_id"],
+            cause="cpu_critical",
             severity="CRITICAL",
             root_cause=f"CPU extreme overload ({cpu:.1f}%)"
         )
@@ -44,17 +274,23 @@ def analyze_metrics(metrics):
             "severity": "CRITICAL",
             "risk": max(risk, 90),
             "eta_minutes": eta or 2,
-            "incident_id": incident_id
+            "future_cpu": future_cpu,
+            "anomaly_score": anomaly_score,
+            "anomaly_contributions": contributions,
+            "incident_id": incident_id,
+            "incident_state": incident_state,
+            "cause": "cpu_critical"
         }
 
     # =====================================================
     # Sustained High CPU
     # =====================================================
-    if sustained_cpu_high():
+    if sustained_cpu_high(metrics["node_id"], metrics["service_id"]):
 
-        incident_id = create_incident(
+        incident_id, incident_state = record_incident(
             service_id=metrics["service_id"],
             node_id=metrics["node_id"],
+            cause="cpu_sustained",
             severity="HIGH",
             root_cause=f"Sustained high CPU ({cpu:.1f}%)"
         )
@@ -64,17 +300,23 @@ def analyze_metrics(metrics):
             "severity": "HIGH",
             "risk": max(risk, 75),
             "eta_minutes": eta or 10,
-            "incident_id": incident_id
+            "future_cpu": future_cpu,
+            "anomaly_score": anomaly_score,
+            "anomaly_contributions": contributions,
+            "incident_id": incident_id,
+            "incident_state": incident_state,
+            "cause": "cpu_sustained"
         }
 
     # =====================================================
     # Normal Risk Logic
     # =====================================================
-    if risk >= 70:
+    if risk >= RISK_INCIDENT:
 
-        incident_id = create_incident(
+        incident_id, incident_state = record_incident(
             service_id=metrics["service_id"],
             node_id=metrics["node_id"],
+            cause="risk_high",
             severity="HIGH",
             root_cause=f"Failure Risk {risk:.1f}%"
         )
@@ -84,10 +326,19 @@ def analyze_metrics(metrics):
             "severity": "HIGH",
             "risk": risk,
             "eta_minutes": eta,
-            "incident_id": incident_id
+            "future_cpu": future_cpu,
+            "anomaly_score": anomaly_score,
+            "anomaly_contributions": contributions,
+            "incident_id": incident_id,
+            "incident_state": incident_state,
+            "cause": "risk_high"
         }
 
     return {
         "anomaly": False,
-        "risk": risk
+        "risk": risk,
+        "eta_minutes": eta,
+        "future_cpu": future_cpu,
+        "anomaly_score": anomaly_score,
+        "anomaly_contributions": contributions
     }
@@ -0,0 +1,329 @@
+import os
+import sys
+import time
+import queue
+import signal
+import logging
+import threading
+import multiprocessing as mp
+from multiprocessing import util as mp_util
+
+from bharat.services.event_bus import add_listener, publish
+from bharat.services.config import (
+    ENGINE_MODE,
+    ENGINE_RESTART_BACKOFF,
+    ENGINE_RESTART_MAX_BACKOFF,
+    ENGINE_HEALTHY_SECONDS,
+    ENGINE_RELAY_QUEUE_MAX,
+    ENGINE_STATS_INTERVAL
+)
+
+
+logger = logging.getLogger("ENGINE")
+logger.setLevel(logging.INFO)
+
+# Fresh interpreter for the worker: no inherited threads, locks or
+# SQLite connections from the web process
+_ctx = mp.get_context("spawn")
+
+STATS_EVENT = "engine_stats"
+
+
+# =========================================================
+# Engine Stats Snapshot (built in whichever process runs it)
+# =========================================================
+def collect_engine_stats():
+
+    from bharat.services.remediation_service import remediation_stats
+    from bharat.services.ml_engine import anomaly_model_stats
+    from bharat.services.detection_engine import streaming_stats
+    from bharat.services.ingest_service import ingestion_stats
+    from bharat.services.lazy_imports import import_costs
+    from bharat.services.model_training import training_stats
+
+    return {
+        "pid": os.getpid(),
+        "timestamp": time.time(),
+        "remediation": remediation_stats(),
+        "anomaly_model": anomaly_model_stats(),
+        "streaming_gate": streaming_stats(),
+        "ingestion": ingestion_stats(),
+        "training": training_stats(),
+        "import_ms": import_costs(),
+        "relay_dropped": _relay_dropped
+    }
+
+
+# =========================================================
+# Worker Process
+# =========================================================
+_relay_dropped = 0
+
+
+def _forward(events):
+
+    def callback(event, data):
+
+        global _relay_dropped
+
+        try:
+            events.put_nowait((event, data))
+        except queue.Full:
+            _relay_dropped += 1
+
+    return callback
+
+
+def _stats_loop(events):
+
+    while True:
+        time.sleep(ENGINE_STATS_INTERVAL)
+
+        try:
+            events.put_nowait((STATS_EVENT, collect_engine_stats()))
+        except queue.Full:
+            pass
+        except Exception as e:
+            logger.error(f"Engine stats snapshot failed: {e}")
+
+
+def _watch_parent(parent_pid):
+
+    # Exit (flushing buffered rows) if the web process goes away
+    while True:
+        time.sleep(2)
+
+        if os.getppid() != parent_pid:
+            os.kill(os.getpid(), signal.SIGTERM)
+            return
+
+
+def _worker_main(events, parent_pid):
+
+    from bharat.services.scheduler_service import start_scheduler
+
+    # SIGTERM -> SystemExit so atexit hooks (ingestion flush) run
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    # Never block shutdown on events the parent will not read
+    events.cancel_join_thread()
+
+    add_listener(_forward(events))
+
+    for target, args in (
+        (_stats_loop, (events,)),
+        (_watch_parent, (parent_pid,))
+    ):
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+    start_scheduler()
+
+
+# =========================================================
+# Supervisor (web process)
+# =========================================================
+_state = {
+    "mode": ENGINE_MODE,
+    "pid": None,
+    "alive": False,
+    "started_at": None,
+    "restarts": 0,
+    "last_exit_code": None,
+    "relayed": 0,
+    "stats": None
+}
+
+_supervisor = None
+_process = None
+_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+def _relay_loop(events, exited):
+
+    while True:
+
+        try:
+            event, data = events.get(timeout=0.5)
+
+        except queue.Empty:
+            # Drained after the worker is gone: this incarnation is done
+            if exited.is_set():
+                return
+            continue
+
+        except (EOFError, OSError):
+            return
+
+        except Exception as e:
+            logger.error(f"Dropped unreadable engine event: {e}")
+            continue
+
+        if event == STATS_EVENT:
+            _state["stats"] = data
+            continue
+
+        _state["relayed"] += 1
+
+        # Re-published locally: risk state, dashboard cache and
+        # SSE clients see worker events as if they were in-process
+        publish(event, data)
+
+
+def _supervise():
+
+    global _process
+
+    backoff = ENGINE_RESTART_BACKOFF
+
+    while True:
+
+        # Fresh queue and relay per worker: a queue the previous
+        # worker was killed while writing to may be corrupted
+        events = _ctx.Queue(maxsize=ENGINE_RELAY_QUEUE_MAX)
+        exited = threading.Event()
+
+        relay = threading.Thread(
+            target=_relay_loop,
+            args=(events, exited),
+            name="engine-relay",
+            daemon=True
+        )
+        relay.start()
+
+        process = _ctx.Process(
+            target=_worker_main,
+            args=(events, os.getpid()),
+            name="sentinel-engine"
+        )
+        process.start()
+
+        with _lock:
+            _process = process
+
+        started = time.time()
+
+        _state.update({
+            "pid": process.pid,
+            "alive": True,
+            "started_at": started
+        })
+
+        print(f"🟢 Monitoring engine started (pid {process.pid})")
+
+        process.join()
+
+        _state.update({"alive": False, "last_exit_code": process.exitcode})
+
+        exited.set()
+        relay.join(timeout=5)
+        events.close()
+
+        if _stopping.is_set():
+            return
+
+        # A run that stayed up long enough earns a fresh backoff
+        if time.time() - started >= ENGINE_HEALTHY_SECONDS:
+            backoff = ENGINE_RESTART_BACKOFF
+
+        print(
+            f"💥 Monitoring engine exited (code {process.exitcode}), "
+            f"restarting in {backoff:.0f}s"
+        )
+
+        time.sleep(backoff)
+
+        backoff = min(backoff * 2, ENGINE_RESTART_MAX_BACKOFF)
+        _state["restarts"] += 1
+
+
+def _stop_engine():
+
+    _stopping.set()
+
+    with _lock:
+        process = _process
+
+    if process is not None and process.is_alive():
+        process.terminate()
+        process.join(timeout=10)
+
+
+def start_engine_process():
+
+    global _supervisor
+
+    with _lock:
+
+        if _supervisor is not None:
+            return False
+
+        _supervisor = threading.Thread(
+            target=_supervise,
+            name="engine-supervisor",
+            daemon=True
+        )
+        _supervisor.start()
+
+    # Runs before multiprocessing joins its children at exit, so the
+    # worker is stopped first rather than waited on forever
+    mp_util.Finalize(None, _stop_engine, exitpriority=10)
+
+    return True
+
+
+# =========================================================
+# Entry Point (thread or process, per ENGINE_MODE)
+# =========================================================
+_thread = None
+
+
+def start_engine(app=None):
+    """
+    Start the monitoring engine once. ``app`` is the Flask app whose
+    context the in-thread scheduler runs under.
+    """
+
+    global _thread
+
+    if ENGINE_MODE == "process":
+        return start_engine_process()
+
+    with _lock:
+
+        if _thread is not None:
+            return False
+
+        def run():
+            from bharat.services.scheduler_service import start_scheduler
+
+            print("🟢 Background Scheduler thread started")
+
+            if app is None:
+                start_scheduler()
+                return
+
+            with app.app_context():
+                start_scheduler()
+
+        _thread = threading.Thread(target=run, name="sentinel-scheduler", daemon=True)
+        _thread.start()
+
+    return True
+
+
+def engine_status():
+
+    if ENGINE_MODE != "process":
+        return {"mode": ENGINE_MODE, "alive": _thread is not None and _thread.is_alive()}
+
+    return {key: value for key, value in _state.items() if key != "stats"}
+
+
+def engine_stats():
+    """Latest stats from wherever the engine runs."""
+
+    if ENGINE_MODE == "process":
+        return _state["stats"] or {}
+
+    return collect_engine_stats()
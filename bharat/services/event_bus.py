@@ -0,0 +1,78 @@
+import queue
+import threading
+import logging
+
+from bharat.services.config import STREAM_QUEUE_MAX
+
+
+logger = logging.getLogger("EVENT_BUS")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# In-Process Publish / Subscribe
+# =========================================================
+# queue -> event names it receives (None = all)
+_subscribers = {}
+_listeners = []
+_lock = threading.Lock()
+
+
+def subscribe(maxsize=STREAM_QUEUE_MAX, events=None):
+    """Queue of ``(event, data)``, limited to ``events`` if given."""
+
+    q = queue.Queue(maxsize=maxsize)
+
+    with _lock:
+        _subscribers[q] = frozenset(events) if events is not None else None
+
+    return q
+
+
+def unsubscribe(q):
+
+    with _lock:
+        _subscribers.pop(q, None)
+
+
+def add_listener(callback):
+    """Call ``callback(event, data)`` synchronously on every publish."""
+
+    with _lock:
+        _listeners.append(callback)
+
+
+def subscriber_count():
+
+    with _lock:
+        return len(_subscribers)
+
+
+def publish(event, data):
+    """Fan an event out to every subscriber without blocking."""
+
+    with _lock:
+        subscribers = [
+            q for q, wanted in _subscribers.items()
+            if wanted is None or event in wanted
+        ]
+        listeners = list(_listeners)
+
+    for callback in listeners:
+        try:
+            callback(event, data)
+        except Exception as e:
+            logger.error(f"Event listener failed on {event}: {e}")
+
+    for q in subscribers:
+
+        try:
+            q.put_nowait((event, data))
+
+        except queue.Full:
+            # Slow consumer: drop its oldest event, keep the newest
+            try:
+                q.get_nowait()
+                q.put_nowait((event, data))
+            except (queue.Empty, queue.Full):
+                pass
@@ -1,44 +1,79 @@
-from datetime import datetime
-from bharat.services.database import get_connection
+import threading
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from bharat.services.database import get_cursor
+from bharat.services.event_bus import publish
+from bharat.services.config import (
+    INCIDENT_RECOVERY_SECONDS,
+    INCIDENT_TOUCH_INTERVAL
+)
+
+
+logger = logging.getLogger("INCIDENTS")
+logger.setLevel(logging.INFO)
+
+SEVERITY_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
 
 
 # =========================================================
-# Create Incident
+# Fingerprint
 # =========================================================
-def create_incident(service_id, node_id, severity, root_cause="Unknown"):
+def incident_fingerprint(node_id, service_id, cause):
+    return f"{node_id}:{service_id}:{cause}"
 
-    conn = get_connection()
-    cursor = conn.cursor()
+
+# =========================================================
+# Create Incident
+# =========================================================
+def create_incident(service_id, node_id, severity, root_cause="Unknown",
+                    cause="unknown"):
 
     created_at = datetime.utcnow().isoformat()
 
-    cursor.execute(
-        """
-        INSERT INTO incidents (
-            created_at,
-            status,
-            severity,
-            service_id,
-            node_id,
-            root_cause
+    with get_cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO incidents (
+                created_at,
+                status,
+                severity,
+                service_id,
+                node_id,
+                root_cause,
+                cause,
+                fingerprint,
+                occurrences,
+                last_seen_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                created_at,
+                "OPEN",
+                severity,
+                service_id,
+                node_id,
+                root_cause,
+                cause,
+                incident_fingerprint(node_id, service_id, cause),
+                1,
+                created_at
+            )
         )
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            created_at,
-            "OPEN",
-            severity,
-            service_id,
-            node_id,
-            root_cause
-        )
-    )
-
-    conn.commit()
 
-    incident_id = cursor.lastrowid
+        incident_id = cursor.lastrowid
 
-    conn.close()
+    publish("incident", {
+        "id": incident_id,
+        "severity": severity,
+        "status": "OPEN",
+        "service_id": service_id,
+        "node_id": node_id,
+        "root_cause": root_cause,
+        "created_at": created_at
+    })
 
     return incident_id
 
@@ -48,58 +83,262 @@ def create_incident(service_id, node_id, severity, root_cause="Unknown"):
 # =========================================================
 def resolve_incident(incident_id):
 
-    conn = get_connection()
-    cursor = conn.cursor()
-
     resolved_at = datetime.utcnow().isoformat()
 
-    cursor.execute(
-        """
-        UPDATE incidents
-        SET status=?, resolved_at=?
-        WHERE id=?
-        """,
-        ("RESOLVED", resolved_at, incident_id)
-    )
+    with get_cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE incidents
+            SET status=?, resolved_at=?
+            WHERE id=?
+            """,
+            ("RESOLVED", resolved_at, incident_id)
+        )
 
-    conn.commit()
-    conn.close()
+    publish("incident_resolved", {
+        "id": incident_id,
+        "status": "RESOLVED",
+        "resolved_at": resolved_at
+    })
 
     return {"incident_id": incident_id, "status": "RESOLVED"}
 
 
 # =========================================================
-# Get All Incidents
+# Incident Engine — open incidents tracked in memory
 # =========================================================
-def get_all_incidents():
+# fingerprint -> {id, node_id, service_id, cause, severity,
+#                 root_cause, occurrences, last_seen, persisted_at}
+_open = {}
+_loaded = False
+_engine_lock = threading.Lock()
+
 
-    conn = get_connection()
-    cursor = conn.cursor()
+def _load_open_incidents():
 
-    cursor.execute(
-        """
-        SELECT id, severity, status, service_id,
-               node_id, root_cause, created_at, resolved_at
-        FROM incidents
-        ORDER BY id DESC
-        """
-    )
+    global _loaded
 
-    rows = cursor.fetchall()
-    conn.close()
+    with get_cursor() as cursor:
+        cursor.execute("""
+            SELECT id, node_id, service_id, cause, fingerprint,
+                   severity, root_cause, occurrences, last_seen_at
+            FROM incidents
+            WHERE status = 'OPEN'
+            ORDER BY id
+        """)
 
-    incidents = []
+        rows = cursor.fetchall()
+
+    duplicates = []
 
     for r in rows:
-        incidents.append({
-            "id": r[0],
-            "severity": r[1],
-            "status": r[2],
-            "service_id": r[3],
-            "node_id": r[4],
-            "root_cause": r[5],
-            "created_at": r[6],
-            "resolved_at": r[7]
-        })
-
-    return incidents
+
+        fingerprint = r["fingerprint"] or incident_fingerprint(
+            r["node_id"], r["service_id"], r["cause"] or "unknown"
+        )
+
+        # Pre-dedup history: keep only the newest OPEN row
+        if fingerprint in _open:
+            duplicates.append(_open[fingerprint]["id"])
+
+        # Stored timestamps are naive UTC
+        last_seen = datetime.fromisoformat(r["last_seen_at"]).replace(
+            tzinfo=timezone.utc
+        ).timestamp() if r["last_seen_at"] else 0
+
+        _open[fingerprint] = {
+            "id": r["id"],
+            "node_id": r["node_id"],
+            "service_id": r["service_id"],
+            "cause": r["cause"] or "unknown",
+            "severity": r["severity"],
+            "root_cause": r["root_cause"],
+            "occurrences": r["occurrences"] or 1,
+            "last_seen": last_seen,
+            "persisted_at": time.time()
+        }
+
+    for incident_id in duplicates:
+        resolve_incident(incident_id)
+
+    if duplicates:
+        logger.info(f"Resolved {len(duplicates)} duplicate OPEN incident(s)")
+
+    _loaded = True
+
+
+def _persist_occurrences(incident):
+
+    last_seen_at = datetime.utcfromtimestamp(incident["last_seen"]).isoformat()
+
+    with get_cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE incidents
+            SET occurrences=?, last_seen_at=?, severity=?, root_cause=?
+            WHERE id=?
+            """,
+            (
+                incident["occurrences"],
+                last_seen_at,
+                incident["severity"],
+                incident["root_cause"],
+                incident["id"]
+            )
+        )
+
+    incident["persisted_at"] = time.time()
+
+
+def record_incident(service_id, node_id, cause, severity, root_cause):
+    """
+    Open an incident for (node, service, cause) or fold this
+    occurrence into the one already open.
+
+    Returns (incident_id, state) where state is "new",
+    "escalated" (severity went up) or "ongoing".
+    """
+
+    fingerprint = incident_fingerprint(node_id, service_id, cause)
+    now = time.time()
+
+    with _engine_lock:
+
+        if not _loaded:
+            _load_open_incidents()
+
+        incident = _open.get(fingerprint)
+
+        # Quiet for a full recovery period (e.g. across a restart):
+        # close it out and treat this as a fresh incident
+        if incident is not None and now - incident["last_seen"] >= INCIDENT_RECOVERY_SECONDS:
+            _persist_occurrences(incident)
+            resolve_incident(incident["id"])
+            del _open[fingerprint]
+            incident = None
+
+        # -------------------------------------------------
+        # First occurrence → new incident
+        # -------------------------------------------------
+        if incident is None:
+
+            incident_id = create_incident(
+                service_id=service_id,
+                node_id=node_id,
+                severity=severity,
+                root_cause=root_cause,
+                cause=cause
+            )
+
+            _open[fingerprint] = {
+                "id": incident_id,
+                "node_id": node_id,
+                "service_id": service_id,
+                "cause": cause,
+                "severity": severity,
+                "root_cause": root_cause,
+                "occurrences": 1,
+                "last_seen": now,
+                "persisted_at": now
+            }
+
+            return incident_id, "new"
+
+        # -------------------------------------------------
+        # Repeat occurrence → update counters
+        # -------------------------------------------------
+        escalated = (
+            SEVERITY_RANK.get(severity, 0) >
+            SEVERITY_RANK.get(incident["severity"], 0)
+        )
+
+        incident["occurrences"] += 1
+        incident["last_seen"] = now
+        incident["root_cause"] = root_cause
+
+        if escalated:
+            incident["severity"] = severity
+
+        # Counters are written at most every INCIDENT_TOUCH_INTERVAL
+        if escalated or now - incident["persisted_at"] >= INCIDENT_TOUCH_INTERVAL:
+            _persist_occurrences(incident)
+
+        return incident["id"], "escalated" if escalated else "ongoing"
+
+
+def resolve_recovered(node_id, service_id, active_causes=()):
+    """
+    Auto-resolve this target's open incidents whose cause has
+    not been seen for INCIDENT_RECOVERY_SECONDS.
+    """
+
+    now = time.time()
+    resolved = []
+
+    with _engine_lock:
+
+        if not _loaded:
+            _load_open_incidents()
+
+        for fingerprint, incident in list(_open.items()):
+
+            if (incident["node_id"], incident["service_id"]) != (node_id, service_id):
+                continue
+
+            if incident["cause"] in active_causes:
+                continue
+
+            if now - incident["last_seen"] < INCIDENT_RECOVERY_SECONDS:
+                continue
+
+            _persist_occurrences(incident)
+            resolve_incident(incident["id"])
+
+            del _open[fingerprint]
+            resolved.append(incident["id"])
+
+    return resolved
+
+
+def open_incident_count():
+
+    with _engine_lock:
+        return len(_open)
+
+
+# =========================================================
+# MTTR (Mean Time To Recovery)
+# =========================================================
+def compute_mttr(since_hours=None):
+
+    params = []
+    window = ""
+
+    if since_hours is not None:
+        window = "AND created_at >= ?"
+        params.append(
+            (datetime.utcnow() - timedelta(hours=since_hours)).isoformat()
+        )
+
+    # Recovery ends at the last bad sample, not at resolved_at, which
+    # trails it by the INCIDENT_RECOVERY_SECONDS quiet window
+    with get_cursor() as cursor:
+        cursor.execute(f"""
+            SELECT
+                COUNT(*),
+                AVG((
+                    julianday(COALESCE(last_seen_at, resolved_at)) -
+                    julianday(created_at)
+                ) * 86400)
+            FROM incidents
+            WHERE status = 'RESOLVED' AND resolved_at IS NOT NULL
+            {window}
+        """, params)
+
+        count, mttr_seconds = cursor.fetchone()
+
+    return {
+        "resolved_incidents": count,
+        "mttr_seconds": round(mttr_seconds, 1) if mttr_seconds is not None else None,
+        "window_hours": since_hours
+    }
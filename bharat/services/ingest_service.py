@@ -0,0 +1,239 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import logging
+import time
+
+from bharat.services.database import insert_ingest_batch, metric_row, risk_row
+from bharat.services.event_bus import publish
+from bharat.services.config import (
+    INGEST_BATCH_SIZE,
+    INGEST_FLUSH_INTERVAL,
+    INGEST_QUEUE_MAX,
+    INGEST_PUT_TIMEOUT,
+    INGEST_WRITE_RETRIES,
+    INGEST_RETRY_BACKOFF
+)
+
+
+logger = logging.getLogger("INGEST")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Write-Behind Queue State
+# =========================================================
+_queue = queue.Queue(maxsize=INGEST_QUEUE_MAX)
+
+_stop = threading.Event()
+_writer = None
+_writer_lock = threading.Lock()
+
+# Serialises flushes between the writer and shutdown
+_flush_lock = threading.Lock()
+
+# Updated from producers, the writer and shutdown
+_stats_lock = threading.Lock()
+
+_stats = {
+    "enqueued": 0,
+    "written": 0,
+    "dropped": 0,
+    "failed": 0,
+    "retries": 0,
+    "batches": 0,
+    "last_batch_size": 0,
+    "last_flush_ms": None
+}
+
+
+def _count(name, amount=1):
+
+    with _stats_lock:
+        _stats[name] += amount
+
+
+# =========================================================
+# Flush
+# =========================================================
+def _write_batch(batch):
+
+    if not batch:
+        return
+
+    with _flush_lock:
+
+        start = time.perf_counter()
+
+        # Items are (kind, row); both kinds share one transaction
+        metric_rows = [row for kind, row in batch if kind == "metrics"]
+        risk_rows = [row for kind, row in batch if kind == "risk"]
+
+        delay = INGEST_RETRY_BACKOFF
+
+        for attempt in range(INGEST_WRITE_RETRIES + 1):
+
+            try:
+                insert_ingest_batch(metric_rows, risk_rows)
+                break
+
+            # "database is locked" and friends are usually transient
+            except sqlite3.OperationalError as e:
+
+                if attempt == INGEST_WRITE_RETRIES:
+                    return _fail(batch, e)
+
+                _count("retries")
+                logger.warning(
+                    f"Metric batch insert failed ({e}), retrying in {delay:.1f}s"
+                )
+
+                time.sleep(delay)
+                delay *= 2
+
+            except Exception as e:
+                return _fail(batch, e)
+
+        with _stats_lock:
+            _stats["written"] += len(batch)
+            _stats["batches"] += 1
+            _stats["last_batch_size"] = len(batch)
+            _stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    # Rows are now visible to DB readers (e.g. dashboard cache)
+    publish("metrics_flushed", {"rows": len(batch)})
+
+
+def _fail(batch, error):
+
+    _count("failed", len(batch))
+    logger.error(f"Metric batch insert failed ({len(batch)} rows), dropped: {error}")
+
+
+def _drain(limit=None):
+
+    batch = []
+
+    while limit is None or len(batch) < limit:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+
+    return batch
+
+
+def flush_metrics():
+    """Write everything currently buffered in one transaction."""
+
+    batch = _drain()
+    _write_batch(batch)
+
+    return len(batch)
+
+
+# =========================================================
+# Background Writer
+# =========================================================
+def _writer_loop():
+
+    while not _stop.is_set():
+
+        batch = []
+        deadline = time.time() + INGEST_FLUSH_INTERVAL
+
+        # -------------------------------------------------
+        # Flush on size or on age, whichever comes first
+        # -------------------------------------------------
+        while len(batch) < INGEST_BATCH_SIZE:
+
+            remaining = deadline - time.time()
+
+            if remaining <= 0 or _stop.is_set():
+                break
+
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+            batch.extend(_drain(INGEST_BATCH_SIZE - len(batch)))
+
+        _write_batch(batch)
+
+
+def start_ingestion():
+
+    global _writer
+
+    with _writer_lock:
+
+        if _writer is not None:
+            return
+
+        _stop.clear()
+
+        _writer = threading.Thread(
+            target=_writer_loop,
+            name="metric-writer",
+            daemon=True
+        )
+        _writer.start()
+
+        atexit.register(stop_ingestion)
+
+
+def stop_ingestion(timeout=5.0):
+    """Stop the writer and flush whatever is still buffered."""
+
+    global _writer
+
+    with _writer_lock:
+
+        writer, _writer = _writer, None
+
+        if writer is None:
+            return 0
+
+        _stop.set()
+        writer.join(timeout=timeout)
+
+    return flush_metrics()
+
+
+# =========================================================
+# Producer API
+# =========================================================
+def _enqueue(kind, row):
+
+    start_ingestion()
+
+    try:
+        # Backpressure: block the producer briefly when full
+        _queue.put((kind, row), timeout=INGEST_PUT_TIMEOUT)
+
+    except queue.Full:
+        _count("dropped")
+        logger.warning(f"Ingestion queue full, {kind} row dropped")
+        return False
+
+    _count("enqueued")
+    return True
+
+
+def enqueue_metrics(metrics: dict):
+    return _enqueue("metrics", metric_row(metrics))
+
+
+def enqueue_risk(record: dict):
+    return _enqueue("risk", risk_row(record))
+
+
+def ingestion_stats():
+
+    with _stats_lock:
+        return {
+            **_stats,
+            "queued": _queue.qsize()
+        }
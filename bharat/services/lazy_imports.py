@@ -0,0 +1,86 @@
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+
+
+logger = logging.getLogger("IMPORTS")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Heavy Modules (kept off the startup path)
+# =========================================================
+HEAVY_MODULES = ("pandas", "sklearn", "prophet", "cmdstanpy")
+
+_costs = {}
+_lock = threading.Lock()
+
+
+# =========================================================
+# Timed Lazy Import
+# =========================================================
+def lazy_import(name):
+    """Import ``name`` on first use and record how long it took."""
+
+    module = sys.modules.get(name)
+
+    if module is not None and name in _costs:
+        return module
+
+    with _lock:
+
+        if name in _costs:
+            return sys.modules[name]
+
+        already_loaded = name in sys.modules
+
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        # Something else imported it first; the cost was paid there
+        _costs[name] = 0.0 if already_loaded else elapsed_ms
+
+    if not already_loaded:
+        logger.info(f"Loaded {name} in {elapsed_ms:.0f} ms")
+
+    return module
+
+
+def module_available(name):
+    """Check that ``name`` is installed without importing it."""
+
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# =========================================================
+# Reports
+# =========================================================
+def import_costs():
+
+    with _lock:
+        return dict(_costs)
+
+
+def heavy_modules_loaded():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def print_startup_report(label, started):
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"⏱️ {label} ready in {elapsed_ms:.0f} ms")
+
+    loaded = heavy_modules_loaded()
+
+    if loaded:
+        print(f"⚠️ Heavy modules imported at startup: {', '.join(loaded)}")
+    else:
+        print("🪶 ML stack deferred until first use")
@@ -0,0 +1,158 @@
+import threading
+import logging
+
+import numpy as np
+
+from bharat.services.config import METRIC_WINDOW_SIZE
+from bharat.services.database import (
+    METRIC_COLUMNS,
+    get_metric_targets,
+    get_recent_metrics_for_target
+)
+
+
+logger = logging.getLogger("METRIC_WINDOW")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Feature Layout (same column order as the metrics table)
+# =========================================================
+FEATURES = METRIC_COLUMNS
+
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+
+# =========================================================
+# Ring Buffer
+# =========================================================
+class MetricWindow:
+    """
+    Fixed-size ring buffer of metric samples for one target.
+
+    Every row is written twice (at ``pos`` and ``pos + capacity``)
+    so the latest N samples are always one contiguous slice and
+    reads are zero-copy, read-only NumPy views in time order.
+
+    Once the buffer has wrapped, the next ``append`` overwrites the
+    oldest row of any live view. Callers that keep the data past an
+    immediate computation (training, forecasting, iteration) must
+    pass ``copy=True``, which copies under the lock.
+    """
+
+    def __init__(self, capacity=METRIC_WINDOW_SIZE):
+
+        self.capacity = capacity
+
+        self._data = np.zeros((2 * capacity, len(FEATURES)))
+        self._head = 0
+        self._count = 0
+
+        # Monotonic number of samples ever appended
+        self.total = 0
+
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, metrics):
+
+        row = [metrics[name] for name in FEATURES]
+
+        with self._lock:
+            self._data[self._head] = row
+            self._data[self._head + self.capacity] = row
+
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self.total += 1
+
+    def extend(self, rows):
+
+        for row in rows:
+            self.append(dict(zip(FEATURES, row)))
+
+    def latest(self, n=None, copy=False):
+        """Return the last ``n`` samples (oldest first) as a view, or a copy."""
+
+        with self._lock:
+            count = self._count if n is None else min(n, self._count)
+            end = self._head + self.capacity
+
+            view = self._data[end - count:end]
+
+            if copy:
+                return view.copy()
+
+        view.flags.writeable = False
+        return view
+
+    def column(self, name, n=None, copy=False):
+        return self.latest(n, copy)[:, FEATURE_INDEX[name]]
+
+
+# =========================================================
+# Process-Wide Registry
+# =========================================================
+_windows = {}
+_registry_lock = threading.Lock()
+
+
+def get_window(node_id, service_id):
+    """
+    Return the window for a target, warming it from the DB
+    the first time the target is seen in this process.
+    """
+
+    key = (node_id, service_id)
+
+    window = _windows.get(key)
+
+    if window is not None:
+        return window
+
+    with _registry_lock:
+
+        window = _windows.get(key)
+
+        if window is None:
+            window = MetricWindow()
+            _warm(window, node_id, service_id)
+            _windows[key] = window
+
+    return window
+
+
+def _warm(window, node_id, service_id):
+
+    try:
+        rows = get_recent_metrics_for_target(
+            node_id, service_id, window.capacity
+        )
+
+        # DB returns newest first
+        window.extend(reversed(rows))
+
+    except Exception as e:
+        logger.error(
+            f"Window warm-up failed for node {node_id} "
+            f"service {service_id}: {e}"
+        )
+
+
+def warm_windows():
+    """Warm every target that already has rows in the DB."""
+
+    for node_id, service_id in get_metric_targets():
+        get_window(node_id, service_id)
+
+    return len(_windows)
+
+
+def append_metrics(metrics):
+
+    window = get_window(metrics["node_id"], metrics["service_id"])
+    window.append(metrics)
+
+    return window
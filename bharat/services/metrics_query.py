@@ -0,0 +1,245 @@
+import math
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from bharat.services.database import get_cursor, METRIC_COLUMNS, ROLLUP_TABLES
+from bharat.services.config import (
+    RAW_RETENTION_HOURS,
+    ROLLUP_1M_RETENTION_DAYS,
+    QUERY_MAX_BUCKETS,
+    QUERY_RAW_MAX_SPAN_HOURS
+)
+
+
+AGGREGATIONS = ("mean", "max", "p95")
+
+
+# =========================================================
+# Time Parsing
+# =========================================================
+def parse_time(value, default):
+    """Epoch seconds or ISO-8601 to naive UTC; naive ISO is taken as UTC."""
+
+    if value is None:
+        return default
+
+    try:
+        epoch = float(value)
+    except ValueError:
+        epoch = None
+
+    if epoch is not None:
+
+        if not math.isfinite(epoch):
+            raise ValueError(f"Invalid time: {value}")
+
+        return datetime.utcfromtimestamp(epoch)
+
+    # Python < 3.11 does not accept a trailing "Z"
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+
+    parsed = datetime.fromisoformat(value)
+
+    # Stored timestamps are naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return parsed
+
+
+# =========================================================
+# Tier Selection
+# =========================================================
+def _pick_tier(start, end, step, now):
+
+    raw_start = now - timedelta(hours=RAW_RETENTION_HOURS)
+    minute_start = now - timedelta(days=ROLLUP_1M_RETENTION_DAYS)
+
+    if start >= raw_start and end - start <= timedelta(hours=QUERY_RAW_MAX_SPAN_HOURS):
+        return "raw"
+
+    if step < 3600 and start >= minute_start:
+        return "1m"
+
+    return "1h"
+
+
+# =========================================================
+# Row Fetch
+# =========================================================
+def _fetch(tier, start, end, agg, node_id, service_id):
+    """Return (timestamps, weights, values) for the range."""
+
+    filters = []
+    params = [start.isoformat(), end.isoformat()]
+
+    if node_id is not None:
+        filters.append("AND node_id = ?")
+        params.append(node_id)
+
+    if service_id is not None:
+        filters.append("AND service_id = ?")
+        params.append(service_id)
+
+    if tier == "raw":
+        sql = f"""
+            SELECT timestamp, 1, {", ".join(METRIC_COLUMNS)}
+            FROM metrics
+            WHERE timestamp >= ? AND timestamp < ?
+            {" ".join(filters)}
+        """
+    else:
+        columns = ", ".join(f"{c}_{agg}" for c in METRIC_COLUMNS)
+
+        sql = f"""
+            SELECT bucket, samples, {columns}
+            FROM {ROLLUP_TABLES[tier]}
+            WHERE bucket >= ? AND bucket < ?
+            {" ".join(filters)}
+        """
+
+    with get_cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    if not rows:
+        return None, None, None
+
+    timestamps = np.array([row[0] for row in rows], dtype="datetime64[us]")
+    weights = np.array([row[1] for row in rows], dtype=float)
+
+    # NULL metrics stay NaN and are left out per column when bucketing
+    values = np.array([row[2:] for row in rows], dtype=float)
+
+    return timestamps, weights, values
+
+
+# =========================================================
+# Vectorised Bucketing
+# =========================================================
+def _bucket(index, weights, values, n_buckets, agg):
+    """
+    Aggregate rows into n_buckets. NaN values are skipped per
+    column; empty buckets and columns with no values are NaN.
+    """
+
+    n_columns = values.shape[1]
+
+    counts = np.bincount(index, weights=weights, minlength=n_buckets)
+    result = np.full((n_buckets, n_columns), np.nan)
+
+    present = ~np.isnan(values)
+
+    if agg == "mean":
+        for col in range(n_columns):
+            column_weights = weights * present[:, col]
+
+            column_counts = np.bincount(
+                index, weights=column_weights, minlength=n_buckets
+            )
+            sums = np.bincount(
+                index,
+                weights=np.where(present[:, col], values[:, col], 0.0) * column_weights,
+                minlength=n_buckets
+            )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[:, col] = sums / column_counts
+
+    elif agg == "max":
+        result.fill(-np.inf)
+
+        # fmax ignores NaN; buckets that saw no value stay at -inf
+        np.fmax.at(result, index, values)
+        result[np.isneginf(result)] = np.nan
+
+    else:
+        # p95: sort by bucket once, then split into groups
+        order = np.argsort(index, kind="stable")
+        sorted_index = index[order]
+        sorted_values = values[order]
+
+        buckets, starts = np.unique(sorted_index, return_index=True)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            for bucket, group in zip(buckets, np.split(sorted_values, starts[1:])):
+                result[bucket] = np.nanpercentile(group, 95, axis=0)
+
+    result[counts == 0] = np.nan
+
+    return result, counts
+
+
+# =========================================================
+# Query
+# =========================================================
+def query_metrics(start, end, step, agg="mean", node_id=None, service_id=None):
+    """
+    Bucket metrics for [start, end) into ``step``-second buckets.
+
+    Raw rows are aggregated for recent, short ranges; longer or
+    older ranges read the matching rollup tier (for p95 this is
+    the p95 of per-bucket p95s, an approximation).
+    """
+
+    if agg not in AGGREGATIONS:
+        raise ValueError(f"agg must be one of {', '.join(AGGREGATIONS)}")
+
+    if step <= 0:
+        raise ValueError("step must be positive")
+
+    if end <= start:
+        raise ValueError("end must be after start")
+
+    span = (end - start).total_seconds()
+    n_buckets = math.ceil(span / step)
+
+    if n_buckets > QUERY_MAX_BUCKETS:
+        raise ValueError(
+            f"{n_buckets} buckets requested, max is {QUERY_MAX_BUCKETS}; "
+            f"increase step"
+        )
+
+    tier = _pick_tier(start, end, step, datetime.utcnow())
+
+    timestamps, weights, values = _fetch(
+        tier, start, end, agg, node_id, service_id
+    )
+
+    bucket_starts = (
+        np.datetime64(start, "us") +
+        np.arange(n_buckets) * np.timedelta64(int(step * 1e6), "us")
+    )
+
+    response = {
+        "tier": tier,
+        "step": step,
+        "agg": agg,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "timestamps": [str(t) for t in bucket_starts],
+        "samples": [0] * n_buckets,
+        "series": {c: [None] * n_buckets for c in METRIC_COLUMNS}
+    }
+
+    if timestamps is None:
+        return response
+
+    offsets = (timestamps - np.datetime64(start, "us")) / np.timedelta64(1, "s")
+    index = np.clip((offsets // step).astype(int), 0, n_buckets - 1)
+
+    result, counts = _bucket(index, weights, values, n_buckets, agg)
+
+    response["samples"] = [int(c) for c in counts]
+
+    for col, name in enumerate(METRIC_COLUMNS):
+        response["series"][name] = [
+            None if np.isnan(v) else round(float(v), 4)
+            for v in result[:, col]
+        ]
+
+    return response
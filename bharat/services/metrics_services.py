@@ -6,7 +6,13 @@ import logging
 from datetime import datetime
 import random
 
-from bharat.services.database import insert_metrics
+from bharat.services.ingest_service import enqueue_metrics
+from bharat.services.metric_window import append_metrics
+from bharat.services.config import (
+    DEFAULT_NODE_ID,
+    DEFAULT_SERVICE_ID,
+    CPU_SAMPLE_INTERVAL
+)
 
 
 # =========================================================
@@ -19,18 +25,107 @@ logger.setLevel(logging.INFO)
 # =========================================================
 # Static identifiers (prototype)
 # =========================================================
-NODE_ID = 1
-SERVICE_ID = 1
+NODE_ID = DEFAULT_NODE_ID
+SERVICE_ID = DEFAULT_SERVICE_ID
+
+
+# =========================================================
+# Background CPU Sampler
+# =========================================================
+_cpu_state = {
+    "cpu_usage": 0.0,
+    "per_core_usage": [],
+    "sampled_at": None
+}
+
+_cpu_lock = threading.Lock()
+_cpu_ready = threading.Event()
+_cpu_sampler = None
+
+
+def _busy_percent(before, after):
+
+    def split(times):
+        idle = times.idle + getattr(times, "iowait", 0)
+
+        # guest time is already counted in user / nice on Linux
+        total = (
+            sum(times)
+            - getattr(times, "guest", 0)
+            - getattr(times, "guest_nice", 0)
+        )
+
+        return idle, total
+
+    idle_before, total_before = split(before)
+    idle_after, total_after = split(after)
+
+    elapsed = total_after - total_before
+
+    if elapsed <= 0:
+        return 0.0
+
+    busy = 1 - (idle_after - idle_before) / elapsed
+
+    return round(max(0.0, min(100.0, busy * 100)), 1)
+
+
+def _sample_cpu_loop():
+
+    previous = psutil.cpu_times()
+    previous_cores = psutil.cpu_times(percpu=True)
+
+    while True:
+
+        time.sleep(CPU_SAMPLE_INTERVAL)
+
+        current = psutil.cpu_times()
+        current_cores = psutil.cpu_times(percpu=True)
+
+        with _cpu_lock:
+            _cpu_state["cpu_usage"] = _busy_percent(previous, current)
+            _cpu_state["per_core_usage"] = [
+                _busy_percent(b, a)
+                for b, a in zip(previous_cores, current_cores)
+            ]
+            _cpu_state["sampled_at"] = time.time()
+
+        _cpu_ready.set()
+
+        previous, previous_cores = current, current_cores
+
+
+def start_cpu_sampler():
+
+    global _cpu_sampler
+
+    with _cpu_lock:
+
+        if _cpu_sampler is None:
+            _cpu_sampler = threading.Thread(
+                target=_sample_cpu_loop,
+                name="cpu-sampler",
+                daemon=True
+            )
+            _cpu_sampler.start()
 
 
 # =========================================================
 # Metric Helper Functions
 # =========================================================
 def get_cpu_metrics():
-    return {
-        "cpu_usage": psutil.cpu_percent(interval=1),
-        "core_count": psutil.cpu_count()
-    }
+
+    start_cpu_sampler()
+
+    # Only the very first call waits for a full window
+    _cpu_ready.wait(timeout=CPU_SAMPLE_INTERVAL * 2)
+
+    with _cpu_lock:
+        return {
+            "cpu_usage": _cpu_state["cpu_usage"],
+            "per_core_usage": list(_cpu_state["per_core_usage"]),
+            "core_count": psutil.cpu_count()
+        }
 
 
 def get_memory_metrics():
@@ -74,13 +169,13 @@ def get_application_metrics():
 # =========================================================
 # Main Collector Function
 # =========================================================
-def collect_metrics():
+def collect_metrics(node_id=NODE_ID, service_id=SERVICE_ID):
 
     try:
         metrics = {
             "timestamp": datetime.utcnow().isoformat(),
-            "node_id": NODE_ID,
-            "service_id": SERVICE_ID
+            "node_id": node_id,
+            "service_id": service_id
         }
 
         metrics.update(get_cpu_metrics())
@@ -89,8 +184,12 @@ def collect_metrics():
         metrics.update(get_network_metrics())
         metrics.update(get_application_metrics())
 
-        # Save only fields DB expects
-        insert_metrics(metrics)
+        # Feed the in-memory window first (first use warms it
+        # from the DB, which must not yet contain this sample)
+        append_metrics(metrics)
+
+        # Save only fields DB expects (batched write-behind)
+        enqueue_metrics(metrics)
 
         logger.info(
             f"Metrics collected: CPU {metrics['cpu_usage']}%, "
@@ -0,0 +1,302 @@
+import logging
+
+from bharat.services.database import get_connection, METRIC_COLUMNS
+
+
+logger = logging.getLogger("MIGRATIONS")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Helpers
+# =========================================================
+def _columns(cursor, table):
+
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+# =========================================================
+# 1 — Converge base schema
+# =========================================================
+# init_db.py and models.py used to create diverging
+# incidents tables (description vs root_cause, no resolved_at).
+def _converge_schema(cursor):
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            node_id INTEGER NOT NULL,
+            service_id INTEGER NOT NULL,
+            cpu_usage REAL,
+            memory_usage REAL,
+            disk_usage REAL,
+            response_time_ms REAL,
+            error_rate REAL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS incidents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            service_id INTEGER NOT NULL,
+            node_id INTEGER NOT NULL,
+            severity TEXT,
+            root_cause TEXT,
+            status TEXT DEFAULT 'OPEN',
+            created_at TEXT NOT NULL,
+            resolved_at TEXT
+        )
+    """)
+
+    columns = _columns(cursor, "incidents")
+
+    if "root_cause" not in columns:
+        cursor.execute("ALTER TABLE incidents ADD COLUMN root_cause TEXT")
+
+        if "description" in columns:
+            cursor.execute("UPDATE incidents SET root_cause = description")
+
+    if "resolved_at" not in columns:
+        cursor.execute("ALTER TABLE incidents ADD COLUMN resolved_at TEXT")
+
+
+# =========================================================
+# 3 — Rollup tiers
+# =========================================================
+def _create_rollup_tables(cursor):
+
+    value_columns = ",\n".join(
+        f"{column}_{stat} REAL"
+        for column in METRIC_COLUMNS
+        for stat in ("min", "max", "mean", "p95")
+    )
+
+    for tier in ("1m", "1h"):
+
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS metrics_{tier} (
+                bucket TEXT NOT NULL,
+                node_id INTEGER NOT NULL,
+                service_id INTEGER NOT NULL,
+                samples INTEGER NOT NULL,
+                {value_columns},
+                PRIMARY KEY (node_id, service_id, bucket)
+            )
+        """)
+
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_metrics_{tier}_bucket
+            ON metrics_{tier} (bucket)
+        """)
+
+    # Raw timestamps below the watermark are already rolled up
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_state (
+            tier TEXT PRIMARY KEY,
+            watermark TEXT NOT NULL
+        )
+    """)
+
+
+# =========================================================
+# 5 — Incident fingerprints
+# =========================================================
+# Legacy root causes map onto the detection engine's causes
+LEGACY_CAUSES = (
+    ("CPU extreme overload%", "cpu_critical"),
+    ("Sustained high CPU%", "cpu_sustained"),
+    ("Failure Risk%", "risk_high")
+)
+
+
+def _add_incident_fingerprints(cursor):
+
+    columns = _columns(cursor, "incidents")
+
+    for column, ddl in (
+        ("cause", "TEXT"),
+        ("fingerprint", "TEXT"),
+        ("occurrences", "INTEGER DEFAULT 1"),
+        ("last_seen_at", "TEXT")
+    ):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE incidents ADD COLUMN {column} {ddl}")
+
+    for pattern, cause in LEGACY_CAUSES:
+        cursor.execute("""
+            UPDATE incidents SET cause = ?
+            WHERE cause IS NULL AND root_cause LIKE ?
+        """, (cause, pattern))
+
+    cursor.execute("""
+        UPDATE incidents SET
+            cause = COALESCE(cause, 'unknown'),
+            fingerprint = node_id || ':' || service_id || ':' || COALESCE(cause, 'unknown'),
+            occurrences = COALESCE(occurrences, 1),
+            last_seen_at = COALESCE(last_seen_at, created_at)
+        WHERE fingerprint IS NULL
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_incidents_fingerprint_status
+        ON incidents (fingerprint, status)
+    """)
+
+
+# =========================================================
+# Migration List (append only — never reorder)
+# =========================================================
+MIGRATIONS = [
+    (1, "Converge metrics / incidents schema", _converge_schema),
+    (2, "Index per-target metric windows and incident lookups", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_metrics_target_id
+        ON metrics (node_id, service_id, id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_metrics_timestamp
+        ON metrics (timestamp)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_incidents_status_created
+        ON incidents (status, created_at)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_incidents_created
+        ON incidents (created_at)
+        """
+    ]),
+    (3, "Add 1-minute / 1-hour metric rollup tiers", _create_rollup_tables),
+    (4, "Add per-cycle risk history", [
+        """
+        CREATE TABLE IF NOT EXISTS risk_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            node_id INTEGER NOT NULL,
+            service_id INTEGER NOT NULL,
+            risk REAL,
+            severity TEXT,
+            future_cpu REAL,
+            eta_minutes REAL,
+            anomaly INTEGER,
+            warmup INTEGER
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_risk_history_target_id
+        ON risk_history (node_id, service_id, id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_risk_history_timestamp
+        ON risk_history (timestamp)
+        """
+    ]),
+    (5, "Add incident fingerprints and occurrence tracking", _add_incident_fingerprints),
+    (6, "Index incident keyset pagination", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_incidents_status_id
+        ON incidents (status, id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_incidents_target_id
+        ON incidents (node_id, service_id, id)
+        """
+    ]),
+    (7, "Add remediation action log", [
+        """
+        CREATE TABLE IF NOT EXISTS remediation_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            incident_id INTEGER,
+            node_id INTEGER NOT NULL,
+            service_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            status TEXT NOT NULL,
+            requested_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            queue_ms REAL,
+            duration_ms REAL,
+            detail TEXT
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_remediation_target_id
+        ON remediation_actions (node_id, service_id, id)
+        """
+    ]),
+    (8, "Index remediation log for retention", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_remediation_requested
+        ON remediation_actions (requested_at)
+        """
+    ]),
+]
+
+
+# =========================================================
+# Runner
+# =========================================================
+def schema_version():
+
+    conn = get_connection()
+
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def run_migrations():
+    """Apply pending migrations, each in its own transaction."""
+
+    conn = get_connection()
+
+    # Manage transactions explicitly so DDL is covered too
+    conn.isolation_level = None
+
+    applied = []
+
+    try:
+        cursor = conn.cursor()
+
+        current = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+        for version, description, steps in MIGRATIONS:
+
+            if version <= current:
+                continue
+
+            # Re-check under the write lock in case another
+            # process applied it first
+            cursor.execute("BEGIN IMMEDIATE")
+
+            try:
+                current = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+                if version <= current:
+                    cursor.execute("COMMIT")
+                    continue
+
+                if callable(steps):
+                    steps(cursor)
+                else:
+                    for statement in steps:
+                        cursor.execute(statement)
+
+                cursor.execute(f"PRAGMA user_version = {version}")
+                cursor.execute("COMMIT")
+
+            except Exception:
+                cursor.execute("ROLLBACK")
+                logger.error(f"Migration {version} failed: {description}")
+                raise
+
+            logger.info(f"Applied migration {version}: {description}")
+            applied.append(version)
+
+    finally:
+        conn.close()
+
+    return applied
@@ -1,106 +1,606 @@
-import pandas as pd
+import numpy as np
 import logging
+import pickle
 import time
-
-from sklearn.ensemble import IsolationForest
-from prophet import Prophet
-
-from bharat.services.database import get_recent_metrics
+from abc import ABC, abstractmethod
+
+# pandas, scikit-learn and Prophet are imported on first use
+# (after warm-up), never at module load
+from bharat.services.lazy_imports import lazy_import, module_available
+from bharat.services.model_store import save_model, load_model
+from bharat.services.model_registry import ModelRegistry
+from bharat.services.model_training import (
+    submit_training,
+    training_pending,
+    fit_isolation_forest,
+    fit_prophet,
+    quiet_fit_loggers
+)
+from bharat.services.metric_window import get_window, FEATURES
+from bharat.services.database import get_metric_rollups
+from bharat.services.config import (
+    DEFAULT_NODE_ID,
+    DEFAULT_SERVICE_ID,
+    ANOMALY_RETRAIN_POLICY,
+    ANOMALY_RETRAIN_INTERVAL,
+    ANOMALY_RETRAIN_SAMPLES,
+    ANOMALY_DRIFT_THRESHOLD,
+    ANOMALY_DRIFT_WINDOW,
+    ANOMALY_TRAINING_SAMPLES,
+    ANOMALY_MIN_SAMPLES,
+    FORECAST_BACKEND,
+    FORECAST_WINDOW,
+    FORECAST_MIN_SAMPLES,
+    FORECAST_ALPHA,
+    FORECAST_BETA,
+    FORECAST_ROLLUP_POINTS
+)
 
 
 # =========================================================
 # Silence Prophet / CmdStan logs
 # =========================================================
-logging.getLogger("prophet").setLevel(logging.CRITICAL)
-logging.getLogger("cmdstanpy").setLevel(logging.CRITICAL)
+quiet_fit_loggers()
 
 logger = logging.getLogger("ML_ENGINE")
 logger.setLevel(logging.INFO)
 
 
 # =========================================================
-# GLOBAL MODEL CACHE
+# Per-Target Model Registry
 # =========================================================
-_anomaly_model = None
-_forecast_model = None
-_last_train_time = 0
+ANOMALY_METRIC = "all"
+FORECAST_METRIC = "cpu_usage"
+
+# (node_id, service_id) -> (window.total, model, score), so a
+# sample is scored once per cycle however many callers ask
+_score_cache = {}
+
+
+def _model_nbytes(value):
+
+    # Anomaly entries are dicts; forecasters size themselves
+    if isinstance(value, dict):
+        model = value["state"][0]
+        return len(pickle.dumps(model)) if model is not None else 0
+
+    return value.nbytes()
 
-# Retrain interval (seconds)
+
+def _forget(key):
+
+    # The score cache would otherwise keep an evicted model alive
+    if key[2] == ANOMALY_METRIC:
+        _score_cache.pop(key[:2], None)
+
+
+# (node_id, service_id, metric) -> anomaly entry or forecaster;
+# anomaly models span every feature, forecasters one metric
+_models = ModelRegistry(sizeof=_model_nbytes, on_evict=_forget)
+
+# Prophet retrain interval (seconds)
 RETRAIN_INTERVAL = 300   # 5 minutes
 
 
 # =========================================================
-# Train Isolation Forest (cheap)
+# Anomaly Model Lifecycle State
 # =========================================================
-def train_anomaly_model():
+def _empty_meta(node_id, service_id):
 
-    global _anomaly_model
+    return {
+        "node_id": node_id,
+        "service_id": service_id,
+        "restored": False,
+        "trained_at": None,
+        "fit_seconds": None,
+        "fit_count": 0,
+        "training_samples": 0,
+        "trained_total": 0,      # window.total at fit time
+        "train_mean": None,
+        "train_std": None,
+        "train_scores": None,    # sorted decision values, for calibration
+        "last_reason": None
+    }
 
-    history = get_recent_metrics(200)
 
-    if len(history) < 50:
-        return None
+def _swap_anomaly_model(node_id, service_id, model, meta):
 
-    try:
-        df = pd.DataFrame(history, columns=[
-            "cpu", "memory", "disk", "response_time", "error_rate"
-        ])
+    # One tuple assignment swaps model and metadata together; a
+    # reader sees either the old pair or the new one
+    entry = _anomaly_entry(node_id, service_id)
+    entry["state"] = (model, meta)
 
-        model = IsolationForest(
-            contamination=0.05,
-            random_state=42
+    _models.resize((node_id, service_id, ANOMALY_METRIC), _model_nbytes(entry))
+
+
+# =========================================================
+# Train Isolation Forest (in the training pool)
+# =========================================================
+def train_anomaly_model(node_id=DEFAULT_NODE_ID, service_id=DEFAULT_SERVICE_ID,
+                        reason=None):
+    """
+    Fit a fresh model on the target's window off the scheduler
+    thread. The current model keeps serving until the new one is
+    swapped in. Returns False when there is too little data or a
+    fit is already running.
+    """
+
+    window = get_window(node_id, service_id)
+
+    # Copy: the ring buffer keeps moving while the fit is queued
+    history = window.latest(ANOMALY_TRAINING_SAMPLES, copy=True)
+    total = window.total
+
+    if len(history) < ANOMALY_MIN_SAMPLES:
+        return False
+
+    def install(result):
+
+        model, fit_seconds, train_scores = result
+
+        previous = _anomaly_entry(node_id, service_id)["state"][1]
+        trained_at = time.time()
+
+        meta = {
+            **_empty_meta(node_id, service_id),
+            "trained_at": trained_at,
+            "fit_seconds": fit_seconds,
+            "fit_count": previous["fit_count"] + 1,
+            "training_samples": len(history),
+            "trained_total": total,
+            "train_mean": history.mean(axis=0),
+            "train_std": history.std(axis=0),
+            "train_scores": train_scores,
+            "last_reason": reason
+        }
+
+        _swap_anomaly_model(node_id, service_id, model, meta)
+
+        logger.info(
+            f"Anomaly model for node {node_id} service {service_id} trained "
+            f"on {len(history)} samples in {fit_seconds * 1000:.0f} ms"
         )
 
-        model.fit(df)
+        save_model(
+            "anomaly", node_id, service_id,
+            {
+                "model": model,
+                "train_mean": meta["train_mean"],
+                "train_std": meta["train_std"],
+                "train_scores": train_scores
+            },
+            library="scikit-learn",
+            info={
+                "trained_at": trained_at,
+                "training_samples": len(history),
+                "fit_seconds": fit_seconds,
+                "reason": reason
+            }
+        )
 
-        _anomaly_model = model
-        return model
+    # One task per target, so fits spread across the pool
+    return submit_training(
+        ("anomaly", node_id, service_id),
+        fit_isolation_forest, (history,), install
+    )
 
-    except Exception as e:
-        logger.error(f"Anomaly model training failed: {e}")
+
+# =========================================================
+# Warm Start (restore a saved model)
+# =========================================================
+def _restore_anomaly_model(node_id, service_id):
+
+    saved = load_model("anomaly", node_id, service_id, library="scikit-learn")
+
+    if saved is None:
         return None
 
+    payload, info = saved
+
+    meta = {
+        **_empty_meta(node_id, service_id),
+        "restored": True,
+        "trained_at": info["trained_at"],
+        "fit_seconds": info.get("fit_seconds"),
+        "training_samples": info.get("training_samples", 0),
+        # Sample-count policy restarts from here
+        "trained_total": get_window(node_id, service_id).total,
+        "train_mean": payload["train_mean"],
+        "train_std": payload["train_std"],
+        "train_scores": payload["train_scores"],
+        "last_reason": "restored"
+    }
+
+    age_minutes = (time.time() - info["trained_at"]) / 60
+
+    logger.info(
+        f"Restored anomaly model for node {node_id} service {service_id} "
+        f"({age_minutes:.0f} min old)"
+    )
+
+    return payload["model"], meta
+
+
+def _anomaly_entry(node_id, service_id):
+    """
+    Registry entry for a target. Created on first demand, or after
+    eviction, from the saved model if there is a usable one; an
+    empty entry is trained lazily by ``_anomaly_state``.
+    """
+
+    def create():
+
+        restored = _restore_anomaly_model(node_id, service_id)
+
+        if restored is None:
+            return {"state": (None, _empty_meta(node_id, service_id))}
+
+        return {"state": restored}
+
+    return _models.get_or_create(
+        (node_id, service_id, ANOMALY_METRIC), create
+    )
+
+
+def anomaly_model_ready(node_id=DEFAULT_NODE_ID, service_id=DEFAULT_SERVICE_ID):
+    """True when a model fitted on this target is loaded."""
+
+    return _anomaly_entry(node_id, service_id)["state"][0] is not None
+
+
+def restore_models(targets):
+    """Load saved models for ``targets`` before the first cycle."""
+
+    restored = 0
+
+    for target in targets:
+
+        node_id, service_id = target["node_id"], target["service_id"]
+
+        restored += _anomaly_entry(node_id, service_id)["state"][1]["restored"]
+
+        # Creating the forecaster loads its saved state, if any
+        get_forecaster(node_id, service_id)
+
+    return restored
+
 
 # =========================================================
-# Detect anomaly using cached model
+# Retrain Policy
 # =========================================================
-def detect_anomaly(model, metrics):
+def _anomaly_retrain_reason(window, model, meta):
 
     if model is None:
-        return False
+        return "initial"
 
-    try:
-        data = pd.DataFrame([{
-            "cpu": metrics["cpu_usage"],
-            "memory": metrics["memory_usage"],
-            "disk": metrics["disk_usage"],
-            "response_time": metrics["response_time_ms"],
-            "error_rate": metrics["error_rate"]
-        }])
+    if ANOMALY_RETRAIN_POLICY == "samples":
+        new_samples = window.total - meta["trained_total"]
 
-        prediction = model.predict(data)
+        if new_samples >= ANOMALY_RETRAIN_SAMPLES:
+            return "samples"
 
-        return prediction[0] == -1
+        return None
 
-    except Exception as e:
-        logger.error(f"Anomaly detection failed: {e}")
-        return False
+    if ANOMALY_RETRAIN_POLICY == "drift":
+        recent = window.latest(ANOMALY_DRIFT_WINDOW, copy=True)
+
+        if len(recent) < ANOMALY_DRIFT_WINDOW:
+            return None
+
+        # Guard against zero-variance features (e.g. static disk usage)
+        std = np.maximum(meta["train_std"], 1e-6)
+        shift = np.abs(recent.mean(axis=0) - meta["train_mean"]) / std
+
+        if shift.max() >= ANOMALY_DRIFT_THRESHOLD:
+            return "drift"
+
+        return None
+
+    # Default: time-based
+    if time.time() - meta["trained_at"] >= ANOMALY_RETRAIN_INTERVAL:
+        return "time"
+
+    return None
 
 
 # =========================================================
-# Train Prophet Forecast Model (EXPENSIVE)
+# Cached Anomaly Model (retrains only when policy says so)
 # =========================================================
-def _train_forecast_model():
+def _anomaly_state(node_id, service_id):
 
-    history = get_recent_metrics(200)
+    model, meta = _anomaly_entry(node_id, service_id)["state"]
 
-    if len(history) < 30:
-        return None
+    reason = _anomaly_retrain_reason(get_window(node_id, service_id), model, meta)
 
-    try:
-        cpu_values = [row[0] for row in history]
+    if (
+        reason is not None and
+        not training_pending(("anomaly", node_id, service_id)) and
+        train_anomaly_model(node_id, service_id, reason)
+    ):
+        logger.info(
+            f"Retraining anomaly model for node {node_id} "
+            f"service {service_id} ({reason})"
+        )
+
+    return model, meta
+
+
+def get_anomaly_model(node_id=DEFAULT_NODE_ID, service_id=DEFAULT_SERVICE_ID):
+    return _anomaly_state(node_id, service_id)[0]
+
+
+# =========================================================
+# Anomaly Model Stats
+# =========================================================
+def anomaly_model_stats():
+
+    now = time.time()
+
+    models = []
+
+    for (node_id, service_id, metric), entry in _models.items():
+
+        if metric != ANOMALY_METRIC:
+            continue
+
+        model, meta = entry["state"]
+
+        models.append({
+            "node_id": node_id,
+            "service_id": service_id,
+            "trained": model is not None,
+            "restored": meta["restored"],
+            "model_age_seconds": (
+                round(now - meta["trained_at"], 1) if meta["trained_at"] else None
+            ),
+            "fit_seconds": meta["fit_seconds"],
+            "fit_count": meta["fit_count"],
+            "training_samples": meta["training_samples"],
+            "last_retrain_reason": meta["last_reason"]
+        })
+
+    return {
+        "policy": ANOMALY_RETRAIN_POLICY,
+        "trained": sum(m["trained"] for m in models),
+        "models": models,
+        "registry": _models.stats()
+    }
+
+
+# =========================================================
+# Feature Row (FEATURES order)
+# =========================================================
+def _feature_row(metrics):
+    return [metrics[name] for name in FEATURES]
+
+
+# =========================================================
+# Score Calibration and Feature Contributions
+# =========================================================
+def _calibrate(values, meta):
+
+    train_scores = meta["train_scores"]
+
+    # Share of training samples with a higher (more normal) decision value
+    below = np.searchsorted(train_scores, values, side="right")
+
+    return 1.0 - below / len(train_scores)
+
+
+def _contributions(rows, meta):
+
+    # How far each feature sits from its training mean, as a share of
+    # the sample's total deviation
+    std = np.maximum(meta["train_std"], 1e-6)
+    z = np.abs(rows - meta["train_mean"]) / std
+
+    totals = z.sum(axis=1, keepdims=True)
+
+    return np.divide(z, totals, out=np.zeros_like(z), where=totals > 0)
+
+
+# =========================================================
+# Anomaly Scoring (many targets per call)
+# =========================================================
+def score_anomalies(samples):
+    """
+    Score the latest sample of many targets at once.
+
+    ``samples`` maps ``(node_id, service_id)`` to a metrics dict.
+    Each target has its own model, so each is scored with one
+    ``decision_function`` call; unchanged samples reuse the cached
+    score. Returns ``(node_id, service_id) -> {"score", "calibrated",
+    "anomaly", "contributions"}``; ``score`` is the raw decision
+    value (below zero is anomalous) and ``calibrated`` is in [0, 1].
+    Targets without a model are left out.
+    """
+
+    scores = {}
+
+    for key, metrics in samples.items():
+
+        model, meta = _anomaly_state(*key)
+
+        if model is None:
+            continue
+
+        total = get_window(*key).total
+        cached = _score_cache.get(key)
+
+        if cached is not None and cached[0] == total and cached[1] is model:
+            scores[key] = cached[2]
+            continue
+
+        try:
+            row = np.asarray([_feature_row(metrics)], dtype=float)
+
+            # decision_function = score_samples - offset_; < 0 is what
+            # predict() reports as -1
+            value = model.decision_function(row)[0]
+
+            calibrated = _calibrate(value, meta)
+            contributions = _contributions(row, meta)[0]
+
+        except Exception as e:
+            logger.error(f"Anomaly scoring failed for {key}: {e}")
+            continue
+
+        score = {
+            "score": float(value),
+            "calibrated": round(float(calibrated), 4),
+            "anomaly": bool(value < 0),
+            "contributions": {
+                name: round(float(share), 3)
+                for name, share in zip(FEATURES, contributions)
+            }
+        }
+
+        scores[key] = score
+        _score_cache[key] = (total, model, score)
+
+    return scores
+
+
+# =========================================================
+# Forecaster Interface
+# =========================================================
+class Forecaster(ABC):
+    """
+    Per-target CPU forecaster.
+
+    ``update`` brings the backend in line with the target's
+    metric window; ``forecast`` returns the mean predicted CPU
+    over the next ``horizon`` steps, or None if not ready.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def update(self, window):
+        pass
+
+    @abstractmethod
+    def forecast(self, horizon):
+        pass
+
+    def nbytes(self):
+        """Approximate memory held, for the model registry budget."""
+        return len(pickle.dumps(self))
+
+
+# =========================================================
+# Holt Linear Trend Forecaster (incremental, O(1)/sample)
+# =========================================================
+class HoltForecaster(Forecaster):
+
+    name = "holt"
+
+    def __init__(self, node_id=None, service_id=None,
+                 alpha=FORECAST_ALPHA, beta=FORECAST_BETA):
+
+        self.alpha = alpha
+        self.beta = beta
+
+        self.level = None
+        self.trend = 0.0
+
+        # window.total already folded into the state
+        self.seen_total = 0
+
+    def _step(self, value):
+
+        if self.level is None:
+            self.level = float(value)
+            return
+
+        previous = self.level
+
+        self.level = (
+            self.alpha * value +
+            (1 - self.alpha) * (self.level + self.trend)
+        )
+        self.trend = (
+            self.beta * (self.level - previous) +
+            (1 - self.beta) * self.trend
+        )
+
+    def update(self, window):
+
+        new_samples = window.total - self.seen_total
+
+        if new_samples <= 0:
+            return
+
+        # Fell behind the ring buffer: rebuild from what is left
+        if new_samples > len(window):
+            self.level = None
+            self.trend = 0.0
+            new_samples = len(window)
+
+        for value in window.column("cpu_usage", new_samples, copy=True):
+            self._step(value)
+
+        self.seen_total = window.total
+
+    def forecast(self, horizon):
+
+        if self.level is None or self.seen_total < FORECAST_MIN_SAMPLES:
+            return None
+
+        # Mean of level + h * trend for h = 1..horizon
+        return self.level + self.trend * (horizon + 1) / 2
+
+
+# =========================================================
+# Prophet Forecaster (optional, EXPENSIVE)
+# =========================================================
+class ProphetForecaster(Forecaster):
 
-        df = pd.DataFrame({
+    name = "prophet"
+
+    def __init__(self, node_id=None, service_id=None):
+
+        self.node_id = node_id
+        self.service_id = service_id
+
+        self.model = None
+        self.model_bytes = 0
+        self.trained_at = 0
+
+        saved = load_model("forecast", node_id, service_id, library="prophet")
+
+        if saved is not None:
+            model_json, info = saved
+
+            self._install(model_json, info["trained_at"], persist=False)
+
+            logger.info(f"Restored forecast model for node {node_id} service {service_id}")
+
+    def _history(self, window):
+
+        pd = lazy_import("pandas")
+
+        # Prefer the 1-minute rollup tier: longer horizon, real timestamps
+        rollups = get_metric_rollups(
+            "1m", self.node_id, self.service_id, FORECAST_ROLLUP_POINTS
+        )
+
+        if len(rollups) >= FORECAST_MIN_SAMPLES:
+            rollups.reverse()
+
+            return pd.DataFrame({
+                "ds": pd.to_datetime([row[0] for row in rollups]),
+                "y": [row[2] for row in rollups]
+            })
+
+        # Oldest first, so the series lines up with the date range;
+        # copied because the fit may run after the window moves on
+        cpu_values = window.column("cpu_usage", 200, copy=True)
+
+        if len(cpu_values) < FORECAST_MIN_SAMPLES:
+            return None
+
+        return pd.DataFrame({
             "ds": pd.date_range(
                 end=pd.Timestamp.now(),
                 periods=len(cpu_values),
@@ -109,59 +609,121 @@ def _train_forecast_model():
             "y": cpu_values
         })
 
-        model = Prophet(
-            yearly_seasonality=False,
-            weekly_seasonality=False,
-            daily_seasonality=False
+    def _install(self, model_json, fitted_at, persist=True):
+
+        serialize = lazy_import("prophet.serialize")
+
+        # Plain attribute swap: forecast() sees the old or new model
+        self.model = serialize.model_from_json(model_json)
+        self.model_bytes = len(model_json)
+        self.trained_at = fitted_at
+
+        _models.resize(
+            (self.node_id, self.service_id, FORECAST_METRIC), self.model_bytes
         )
 
-        model.fit(df)
+        if persist:
+            save_model(
+                "forecast", self.node_id, self.service_id, model_json,
+                library="prophet",
+                info={"trained_at": fitted_at}
+            )
 
-        return model
+    def update(self, window):
 
-    except Exception as e:
-        logger.error(f"Forecast model training failed: {e}")
-        return None
+        now = time.time()
 
+        # Retrain only periodically
+        if self.model is not None and now - self.trained_at <= RETRAIN_INTERVAL:
+            return
 
-# =========================================================
-# Forecast CPU with caching
-# =========================================================
-def forecast_cpu():
+        key = ("forecast", self.node_id, self.service_id)
 
-    global _forecast_model, _last_train_time
+        if training_pending(key):
+            return
 
-    now = time.time()
+        try:
+            df = self._history(window)
+        except Exception as e:
+            logger.error(f"Forecast history load failed: {e}")
+            return
+
+        if df is None:
+            return
 
-    # -----------------------------------------------------
-    # Retrain only periodically
-    # -----------------------------------------------------
-    if (
-        _forecast_model is None or
-        now - _last_train_time > RETRAIN_INTERVAL
-    ):
         logger.info("Retraining forecast model...")
 
-        model = _train_forecast_model()
+        # Each target's fit is its own task, spread over the pool
+        submit_training(
+            key, fit_prophet, (df,),
+            lambda model_json: self._install(model_json, now)
+        )
+
+    def forecast(self, horizon):
 
-        if model:
-            _forecast_model = model
-            _last_train_time = now
-        else:
+        if self.model is None:
             return None
 
-    # -----------------------------------------------------
-    # Predict future CPU
-    # -----------------------------------------------------
-    try:
-        future = _forecast_model.make_future_dataframe(
-            periods=30,
-            freq="min"
+        # Predict only the future horizon, not the full history
+        future = self.model.make_future_dataframe(
+            periods=horizon,
+            freq="min",
+            include_history=False
         )
 
-        forecast = _forecast_model.predict(future)
+        forecast = self.model.predict(future)
+
+        return forecast["yhat"].mean()
+
+    def nbytes(self):
+        # Serialized size stands in for the fitted model's footprint
+        return self.model_bytes
+
+
+FORECAST_BACKENDS = {
+    HoltForecaster.name: HoltForecaster,
+    ProphetForecaster.name: ProphetForecaster
+}
+
+
+# =========================================================
+# Per-Target Forecasters (in the model registry)
+# =========================================================
+def _create_forecaster(node_id, service_id):
+
+    if FORECAST_BACKEND == ProphetForecaster.name and not module_available("prophet"):
+        logger.warning("Prophet not installed, using Holt forecaster")
+        return HoltForecaster(node_id, service_id)
+
+    backend = FORECAST_BACKENDS.get(FORECAST_BACKEND, HoltForecaster)
 
-        future_cpu = forecast["yhat"].tail(30).mean()
+    return backend(node_id, service_id)
+
+
+def get_forecaster(node_id=DEFAULT_NODE_ID, service_id=DEFAULT_SERVICE_ID):
+
+    # An evicted Holt forecaster rebuilds from the metric window;
+    # a Prophet one reloads from disk or refits
+    return _models.get_or_create(
+        (node_id, service_id, FORECAST_METRIC),
+        lambda: _create_forecaster(node_id, service_id)
+    )
+
+
+# =========================================================
+# Forecast CPU
+# =========================================================
+def forecast_cpu(node_id=DEFAULT_NODE_ID, service_id=DEFAULT_SERVICE_ID):
+
+    forecaster = get_forecaster(node_id, service_id)
+
+    try:
+        forecaster.update(get_window(node_id, service_id))
+
+        future_cpu = forecaster.forecast(FORECAST_WINDOW)
+
+        if future_cpu is None:
+            return None
 
         # Clamp to realistic range
         future_cpu = max(0, min(100, future_cpu))
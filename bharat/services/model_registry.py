@@ -0,0 +1,203 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from bharat.services.config import (
+    MODEL_REGISTRY_MAX_ENTRIES,
+    MODEL_REGISTRY_MAX_MB
+)
+
+
+logger = logging.getLogger("MODEL_REGISTRY")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# LRU Model Registry
+# =========================================================
+class ModelRegistry:
+    """
+    Per-target models keyed by ``(node_id, service_id, metric)``.
+
+    Bounded by entry count and by an approximate byte budget; the
+    least recently used entries are evicted first. Callers recreate
+    evicted entries lazily on their next lookup.
+
+    ``sizeof(value)`` estimates the bytes of a newly created entry;
+    ``on_evict(key)`` lets callers drop anything else that would
+    keep an evicted model alive.
+    """
+
+    def __init__(self, max_entries=MODEL_REGISTRY_MAX_ENTRIES,
+                 max_bytes=MODEL_REGISTRY_MAX_MB * 1024 * 1024,
+                 sizeof=None, on_evict=None):
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.sizeof = sizeof
+        self.on_evict = on_evict
+
+        # key -> [value, nbytes]
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "evicted_bytes": 0
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+
+            return entry[0]
+
+    def get_or_create(self, key, factory):
+        """Return the value for ``key``, building it with ``factory()`` on a miss."""
+
+        value = self.get(key)
+
+        if value is not None:
+            return value
+
+        # Built (and sized) outside the lock: factories may hit the disk
+        created = factory()
+        nbytes = self.sizeof(created) if self.sizeof else 0
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            # Another thread got there first
+            if entry is not None:
+                return entry[0]
+
+            self._entries[key] = [created, nbytes]
+            self._bytes += nbytes
+
+            evicted = self._evict()
+
+        self._notify(evicted)
+
+        return created
+
+    def put(self, key, value, nbytes=0):
+
+        with self._lock:
+
+            old = self._entries.pop(key, None)
+
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = [value, nbytes]
+            self._bytes += nbytes
+
+            evicted = self._evict()
+
+        self._notify(evicted)
+
+    def resize(self, key, nbytes):
+        """Update the size estimate of ``key`` (e.g. after a refit)."""
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return
+
+            self._bytes += nbytes - entry[1]
+            entry[1] = nbytes
+
+            evicted = self._evict()
+
+        self._notify(evicted)
+
+    def discard(self, key):
+
+        with self._lock:
+
+            entry = self._entries.pop(key, None)
+
+            if entry is None:
+                return
+
+            self._bytes -= entry[1]
+
+        self._notify([key])
+
+    def items(self):
+
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def _evict(self):
+
+        evicted = []
+
+        # Never evict the entry just touched (last in order)
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or
+            self._bytes > self.max_bytes
+        ):
+            key, (_, nbytes) = self._entries.popitem(last=False)
+
+            self._bytes -= nbytes
+            self._stats["evictions"] += 1
+            self._stats["evicted_bytes"] += nbytes
+
+            evicted.append(key)
+
+            logger.info(f"Evicted model {key} ({nbytes / 1024:.0f} KiB)")
+
+        return evicted
+
+    def _notify(self, keys):
+
+        # Outside the lock: callbacks may touch other caches
+        if self.on_evict is None:
+            return
+
+        for key in keys:
+            self.on_evict(key)
+
+    def stats(self):
+
+        with self._lock:
+
+            lookups = self._stats["hits"] + self._stats["misses"]
+
+            by_metric = {}
+
+            for key in self._entries:
+                by_metric[key[2]] = by_metric.get(key[2], 0) + 1
+
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "by_metric": by_metric,
+                **self._stats,
+                "hit_rate": (
+                    round(self._stats["hits"] / lookups, 3) if lookups else None
+                )
+            }
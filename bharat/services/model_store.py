@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import pickle
+import logging
+from importlib import metadata
+
+from bharat.services.metric_window import FEATURES
+from bharat.services.config import (
+    MODEL_PERSIST,
+    MODEL_DIR,
+    MODEL_MAX_AGE_HOURS,
+    MODEL_FORMAT_VERSION
+)
+
+
+logger = logging.getLogger("MODEL_STORE")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Paths
+# =========================================================
+def _base_path(kind, node_id, service_id):
+    return os.path.join(MODEL_DIR, f"{kind}_n{node_id}_s{service_id}")
+
+
+def _library_version(library):
+
+    try:
+        return metadata.version(library)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+# =========================================================
+# Save
+# =========================================================
+def save_model(kind, node_id, service_id, payload, library, info=None):
+    """
+    Write ``payload`` (pickled) plus a JSON metadata sidecar.
+    Both land via rename, so readers never see a partial file.
+    """
+
+    if not MODEL_PERSIST:
+        return False
+
+    base = _base_path(kind, node_id, service_id)
+
+    meta = {
+        "version": MODEL_FORMAT_VERSION,
+        "kind": kind,
+        "node_id": node_id,
+        "service_id": service_id,
+        "features": list(FEATURES),
+        "library": library,
+        "library_version": _library_version(library),
+        "saved_at": time.time(),
+        **(info or {})
+    }
+
+    try:
+        os.makedirs(MODEL_DIR, exist_ok=True)
+
+        for path, mode, write in (
+            (base + ".pkl", "wb", lambda f: pickle.dump(payload, f)),
+            (base + ".json", "w", lambda f: json.dump(meta, f, indent=2))
+        ):
+            tmp = path + ".tmp"
+
+            with open(tmp, mode) as f:
+                write(f)
+
+            os.replace(tmp, path)
+
+    except Exception as e:
+        logger.error(f"Saving {kind} model for node {node_id} service {service_id} failed: {e}")
+        return False
+
+    return True
+
+
+# =========================================================
+# Load (only if fresh and compatible)
+# =========================================================
+def _rejection(meta, library):
+
+    if meta.get("version") != MODEL_FORMAT_VERSION:
+        return "format version changed"
+
+    if meta.get("features") != list(FEATURES):
+        return "feature schema changed"
+
+    if meta.get("library_version") != _library_version(library):
+        return f"{library} version changed"
+
+    age_hours = (time.time() - meta.get("trained_at", 0)) / 3600
+
+    if age_hours > MODEL_MAX_AGE_HOURS:
+        return f"stale ({age_hours:.1f} h old)"
+
+    return None
+
+
+def load_model(kind, node_id, service_id, library):
+    """Return ``(payload, meta)`` for a usable saved model, else None."""
+
+    if not MODEL_PERSIST:
+        return None
+
+    base = _base_path(kind, node_id, service_id)
+
+    try:
+        with open(base + ".json") as f:
+            meta = json.load(f)
+
+    except FileNotFoundError:
+        return None
+
+    except Exception as e:
+        logger.error(f"Unreadable model metadata {base}.json: {e}")
+        return None
+
+    reason = _rejection(meta, library)
+
+    if reason is not None:
+        logger.info(f"Ignoring saved {kind} model for node {node_id} service {service_id}: {reason}")
+        return None
+
+    try:
+        with open(base + ".pkl", "rb") as f:
+            payload = pickle.load(f)
+
+    except Exception as e:
+        logger.error(f"Loading saved {kind} model {base}.pkl failed: {e}")
+        return None
+
+    return payload, meta
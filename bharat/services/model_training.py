@@ -0,0 +1,296 @@
+import time
+import logging
+import threading
+import multiprocessing as mp
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bharat.services.lazy_imports import lazy_import
+from bharat.services.config import (
+    TRAINING_MODE,
+    TRAINING_WORKERS,
+    TRAINING_TIMEOUT,
+    ANOMALY_CONTAMINATION
+)
+
+
+logger = logging.getLogger("TRAINING")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Silence Prophet / CmdStan logs
+# =========================================================
+def quiet_fit_loggers():
+
+    # Called in the main process and in every pool worker: spawned
+    # workers start with fresh logging and never import ml_engine
+    logging.getLogger("prophet").setLevel(logging.CRITICAL)
+    logging.getLogger("cmdstanpy").setLevel(logging.CRITICAL)
+
+
+# =========================================================
+# Fit Functions (run inside pool workers; must stay picklable)
+# =========================================================
+def fit_isolation_forest(data):
+
+    IsolationForest = lazy_import("sklearn.ensemble").IsolationForest
+
+    model = IsolationForest(
+        contamination=ANOMALY_CONTAMINATION,
+        random_state=42
+    )
+
+    fit_start = time.perf_counter()
+    model.fit(data)
+    fit_seconds = time.perf_counter() - fit_start
+
+    # Sorted decision values on the training set, for calibration
+    train_scores = np.sort(model.decision_function(data))
+
+    return model, fit_seconds, train_scores
+
+
+def fit_prophet(df):
+
+    Prophet = lazy_import("prophet").Prophet
+    serialize = lazy_import("prophet.serialize")
+
+    model = Prophet(
+        yearly_seasonality=False,
+        weekly_seasonality=False,
+        daily_seasonality=False
+    )
+
+    model.fit(df)
+
+    # Fitted Prophet models cross processes as JSON
+    return serialize.model_to_json(model)
+
+
+# =========================================================
+# Training Pool
+# =========================================================
+_pool = None
+
+# Reentrant: a done callback may run on the submitting thread
+_lock = threading.RLock()
+
+# Fits wait here until a worker is free, so the timeout clock
+# starts when a fit actually starts, not while it queues.
+# key -> (fn, args, on_done)
+_waiting = OrderedDict()
+
+# key -> (future, started_at, fn, args, on_done)
+_running = {}
+
+_stats = {
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "timeouts": 0,
+    "pool_restarts": 0,
+    "last_seconds": {}
+}
+
+
+def _get_pool():
+
+    global _pool
+
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=TRAINING_WORKERS,
+            mp_context=mp.get_context("spawn"),
+            initializer=quiet_fit_loggers
+        )
+
+    return _pool
+
+
+def _kill_pool():
+
+    global _pool
+
+    # A running fit cannot be interrupted; the only way to free its
+    # worker is to kill the process. Executor internals, but the
+    # public shutdown() leaves a hung worker running forever.
+    for process in list(getattr(_pool, "_processes", {}).values()):
+        process.kill()
+
+    _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+    _stats["pool_restarts"] += 1
+
+
+def _expire_stuck(now):
+
+    stuck = [
+        key for key, (_, started, *_) in _running.items()
+        if now - started >= TRAINING_TIMEOUT
+    ]
+
+    if not stuck:
+        return
+
+    for key in stuck:
+        del _running[key]
+        _stats["timeouts"] += 1
+
+        logger.error(f"Training {key} timed out after {TRAINING_TIMEOUT}s")
+
+    # Killing the workers also ends the healthy fits; they go back
+    # to the front of the queue and restart on the new pool
+    for key, (_, _, fn, args, on_done) in _running.items():
+        _waiting[key] = (fn, args, on_done)
+        _waiting.move_to_end(key, last=False)
+
+    _running.clear()
+
+    _kill_pool()
+
+    logger.warning("Training workers killed after a timeout, pool restarted")
+
+
+def _start_waiting(now):
+
+    while _waiting and len(_running) < TRAINING_WORKERS:
+
+        key, (fn, args, on_done) = _waiting.popitem(last=False)
+
+        future = _get_pool().submit(fn, *args)
+
+        _running[key] = (future, now, fn, args, on_done)
+
+        future.add_done_callback(
+            lambda future, key=key: _finished(key, future)
+        )
+
+
+def _pump():
+
+    now = time.time()
+
+    _expire_stuck(now)
+    _start_waiting(now)
+
+
+def _record(key, seconds):
+
+    # Called from pool callback threads and inline callers alike
+    with _lock:
+
+        if seconds is None:
+            _stats["failed"] += 1
+            return
+
+        _stats["completed"] += 1
+        _stats["last_seconds"][str(key)] = round(seconds, 3)
+
+
+def _finished(key, future):
+
+    with _lock:
+        current = _running.get(key)
+
+        # Timed out, or killed with the pool: drop the result
+        if current is None or current[0] is not future:
+            return
+
+        del _running[key]
+
+        started = current[1]
+
+        # A worker is free: start the next queued fit
+        _pump()
+
+    on_done = current[4]
+
+    if future.cancelled():
+        return
+
+    error = future.exception()
+
+    if error is not None:
+        _record(key, None)
+        logger.error(f"Training {key} failed: {error}")
+        return
+
+    _record(key, time.time() - started)
+
+    try:
+        on_done(future.result())
+    except Exception as e:
+        logger.error(f"Installing model {key} failed: {e}")
+
+
+def training_pending(key):
+
+    with _lock:
+        _pump()
+        return key in _waiting or key in _running
+
+
+def _run_inline(key, fn, args, on_done):
+
+    # Same contract as the pool: a failed fit is logged and counted,
+    # never raised into the caller's scoring path
+    start = time.perf_counter()
+
+    try:
+        result = fn(*args)
+    except Exception as e:
+        _record(key, None)
+        logger.error(f"Training {key} failed: {e}")
+        return
+
+    _record(key, time.perf_counter() - start)
+
+    try:
+        on_done(result)
+    except Exception as e:
+        logger.error(f"Installing model {key} failed: {e}")
+
+
+def submit_training(key, fn, args, on_done):
+    """
+    Run ``fn(*args)`` off the calling thread, one fit per ``key``
+    at a time, and pass its result to ``on_done``. Returns False
+    if a fit for ``key`` is already running.
+
+    ``on_done`` runs on a pool callback thread and is where the
+    caller swaps in the new model; until then the old one serves.
+    With TRAINING_MODE = "inline" the fit runs here instead.
+    """
+
+    if TRAINING_MODE != "process":
+        _run_inline(key, fn, args, on_done)
+        return True
+
+    with _lock:
+
+        if key in _waiting or key in _running:
+            return False
+
+        _waiting[key] = (fn, args, on_done)
+        _stats["submitted"] += 1
+
+        _pump()
+
+    return True
+
+
+def training_stats():
+
+    with _lock:
+        return {
+            "mode": TRAINING_MODE,
+            "workers": TRAINING_WORKERS,
+            **{k: v for k, v in _stats.items() if k != "last_seconds"},
+            "queued": [str(key) for key in _waiting],
+            "running": [str(key) for key in _running],
+            "last_seconds": dict(_stats["last_seconds"])
+        }
@@ -1,12 +1,30 @@
+import json
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from bharat.services.database import get_cursor
+from bharat.services.event_bus import publish
+from bharat.services.action_backends import get_backend
+from bharat.services.config import (
+    DEFAULT_NODE_ID,
+    DEFAULT_SCALE_REPLICAS,
+    REMEDIATION_WORKERS,
+    REMEDIATION_MAX_IN_FLIGHT,
+    REMEDIATION_COOLDOWN,
+    REMEDIATION_RATE_LIMIT,
+    REMEDIATION_THROTTLE_RETRY
+)
+
 logger = logging.getLogger("REMEDIATION")
 logger.setLevel(logging.INFO)
 
 
 # =========================================================
-# Restart Service (Simulated)
+# Restart Service
 # =========================================================
 def restart_service(service_id, node_id):
 
@@ -14,31 +32,23 @@ def restart_service(service_id, node_id):
         f"Restarting service {service_id} on node {node_id}"
     )
 
-    return {
-        "action": "restart_service",
-        "status": "success",
-        "service_id": service_id,
-        "node_id": node_id,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return get_backend(node_id, service_id).run(
+        "restart_service", service_id, node_id
+    )
 
 
 # =========================================================
-# Scale Service (Simulated)
+# Scale Service
 # =========================================================
-def scale_service(service_id, replicas=2):
+def scale_service(service_id, replicas=2, node_id=DEFAULT_NODE_ID):
 
     logger.info(
         f"Scaling service {service_id} to {replicas} replicas"
     )
 
-    return {
-        "action": "scale_service",
-        "status": "success",
-        "service_id": service_id,
-        "replicas": replicas,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return get_backend(node_id, service_id).run(
+        "scale_service", service_id, node_id, replicas=replicas
+    )
 
 
 # =========================================================
@@ -50,33 +60,50 @@ def emergency_shutdown(service_id, node_id):
         f"Emergency shutdown for service {service_id} on node {node_id}"
     )
 
-    return {
-        "action": "emergency_shutdown",
-        "status": "success",
-        "service_id": service_id,
-        "node_id": node_id,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return get_backend(node_id, service_id).run(
+        "emergency_shutdown", service_id, node_id
+    )
 
 
 # =========================================================
 # Main Remediation Decision Engine
 # =========================================================
-def trigger_remediation(severity, service_id, node_id):
+def plan_action(severity):
 
     # CRITICAL → strongest action
     if severity == "CRITICAL":
-        return emergency_shutdown(service_id, node_id)
+        return "emergency_shutdown"
 
     # HIGH → restart service
     if severity == "HIGH":
-        return restart_service(service_id, node_id)
+        return "restart_service"
 
     # MEDIUM → scale service
     if severity == "MEDIUM":
-        return scale_service(service_id, replicas=2)
+        return "scale_service"
 
     # LOW → no action
+    return None
+
+
+def run_action(action, service_id, node_id):
+
+    if action == "emergency_shutdown":
+        return emergency_shutdown(service_id, node_id)
+
+    if action == "restart_service":
+        return restart_service(service_id, node_id)
+
+    if action == "scale_service":
+        return scale_service(
+            service_id, replicas=DEFAULT_SCALE_REPLICAS, node_id=node_id
+        )
+
+    raise ValueError(f"Unknown remediation action: {action}")
+
+
+def _no_action(service_id, node_id):
+
     return {
         "action": "none",
         "status": "no_action_needed",
@@ -84,3 +111,291 @@ def trigger_remediation(severity, service_id, node_id):
         "node_id": node_id,
         "timestamp": datetime.utcnow().isoformat()
     }
+
+
+def trigger_remediation(severity, service_id, node_id):
+    """Run the remediation for ``severity`` inline (blocking)."""
+
+    action = plan_action(severity)
+
+    if action is None:
+        return _no_action(service_id, node_id)
+
+    return run_action(action, service_id, node_id)
+
+
+# =========================================================
+# Async Remediation Executor
+# =========================================================
+_executor = ThreadPoolExecutor(
+    max_workers=REMEDIATION_WORKERS,
+    thread_name_prefix="remediation"
+)
+
+_lock = threading.Lock()
+
+_pending = {}          # (node, service, action) -> Future
+_last_action = {}      # (node, service) -> submit time
+_started = deque()     # submit times in the last minute
+
+# (node, service) -> request rejected by cooldown or throttling,
+# resubmitted by ``retry_deferred`` once it may run
+_deferred = {}
+
+_stats = {
+    "submitted": 0,
+    "succeeded": 0,
+    "failed": 0,
+    "coalesced": 0,
+    "cooldown": 0,
+    "throttled": 0,
+    "total_duration_ms": 0.0,
+    "max_duration_ms": 0.0
+}
+
+# (action, backend) -> outcome counts and end-to-end latency
+_action_stats = {}
+
+_recent = deque(maxlen=100)
+
+
+def _record_outcome(record):
+
+    with get_cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO remediation_actions (
+                incident_id, node_id, service_id, action, status,
+                requested_at, started_at, finished_at,
+                queue_ms, duration_ms, detail
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            record["incident_id"],
+            record["node_id"],
+            record["service_id"],
+            record["action"],
+            record["status"],
+            record["requested_at"],
+            record["started_at"],
+            record["finished_at"],
+            record["queue_ms"],
+            record["duration_ms"],
+            record["detail"]
+        ))
+
+
+def _execute(key, record, submitted):
+
+    action, service_id, node_id = record["action"], record["service_id"], record["node_id"]
+
+    started = time.perf_counter()
+    record["started_at"] = datetime.utcnow().isoformat()
+    record["queue_ms"] = round((started - submitted) * 1000, 2)
+
+    try:
+        result = run_action(action, service_id, node_id)
+        record["status"] = result.get("status", "success")
+        record["backend"] = result.get("backend")
+        record["detail"] = json.dumps(result, default=str)
+
+    except Exception as e:
+        result = None
+        record["status"] = "failed"
+        record["detail"] = str(e)
+        logger.error(f"Remediation {action} on {node_id}/{service_id} failed: {e}")
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    record["finished_at"] = datetime.utcnow().isoformat()
+    record["duration_ms"] = duration_ms
+
+    # Request to finish, including time spent queued
+    end_to_end_ms = record["queue_ms"] + duration_ms
+
+    outcome = "succeeded" if record["status"] == "success" else "failed"
+
+    with _lock:
+        _pending.pop(key, None)
+
+        _stats[outcome] += 1
+        _stats["total_duration_ms"] += duration_ms
+        _stats["max_duration_ms"] = max(_stats["max_duration_ms"], duration_ms)
+
+        per_action = _action_stats.setdefault(
+            (action, record.get("backend")),
+            {"succeeded": 0, "failed": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        per_action[outcome] += 1
+        per_action["total_ms"] += end_to_end_ms
+        per_action["max_ms"] = max(per_action["max_ms"], end_to_end_ms)
+
+        _recent.append(dict(record))
+
+    try:
+        _record_outcome(record)
+    except Exception as e:
+        logger.error(f"Could not record remediation outcome: {e}")
+
+    publish("remediation", record)
+
+    return result
+
+
+def submit_remediation(severity, service_id, node_id, incident_id=None):
+    """
+    Queue the remediation for ``severity`` on the worker pool and
+    return immediately with how the request was handled.
+    """
+
+    action = plan_action(severity)
+
+    if action is None:
+        return _no_action(service_id, node_id)
+
+    target = (node_id, service_id)
+    key = (node_id, service_id, action)
+    now = time.time()
+
+    response = {
+        "action": action,
+        "service_id": service_id,
+        "node_id": node_id,
+        "incident_id": incident_id,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+    def defer(status, retry_after):
+
+        _stats[status] += 1
+
+        # Newer requests (e.g. an escalation) replace older ones
+        _deferred[target] = {
+            "severity": severity,
+            "incident_id": incident_id,
+            "retry_at": now + retry_after
+        }
+
+        return {
+            **response,
+            "status": status,
+            "retry_after_seconds": round(retry_after, 1)
+        }
+
+    with _lock:
+
+        # -------------------------------------------------
+        # Same action already queued or running → coalesce
+        # -------------------------------------------------
+        if key in _pending:
+            _deferred.pop(target, None)
+            _stats["coalesced"] += 1
+            return {**response, "status": "coalesced"}
+
+        # -------------------------------------------------
+        # Per-target cooldown
+        # -------------------------------------------------
+        last = _last_action.get(target)
+
+        if last is not None and now - last < REMEDIATION_COOLDOWN:
+            return defer("cooldown", REMEDIATION_COOLDOWN - (now - last))
+
+        # -------------------------------------------------
+        # Global rate limit and max-in-flight
+        # -------------------------------------------------
+        while _started and now - _started[0] > 60:
+            _started.popleft()
+
+        if len(_started) >= REMEDIATION_RATE_LIMIT:
+            return defer("throttled", 60 - (now - _started[0]))
+
+        if len(_pending) >= REMEDIATION_MAX_IN_FLIGHT:
+            return defer("throttled", REMEDIATION_THROTTLE_RETRY)
+
+        record = {
+            **{k: response[k] for k in ("action", "service_id", "node_id", "incident_id")},
+            "status": "queued",
+            "backend": None,
+            "requested_at": response["timestamp"],
+            "started_at": None,
+            "finished_at": None,
+            "queue_ms": None,
+            "duration_ms": None,
+            "detail": None
+        }
+
+        _pending[key] = _executor.submit(
+            _execute, key, record, time.perf_counter()
+        )
+
+        _deferred.pop(target, None)
+
+        _last_action[target] = now
+        _started.append(now)
+        _stats["submitted"] += 1
+
+    return {**response, "status": "queued"}
+
+
+def retry_deferred(service_id, node_id, incident_id):
+    """
+    Resubmit the request deferred for this target once its retry
+    time has passed. Called on every cycle of an ongoing incident;
+    returns None when there is nothing to submit yet.
+    """
+
+    target = (node_id, service_id)
+
+    with _lock:
+
+        entry = _deferred.get(target)
+
+        if entry is None:
+            return None
+
+        # Deferred for an incident that has since closed
+        if entry["incident_id"] != incident_id:
+            del _deferred[target]
+            return None
+
+        if time.time() < entry["retry_at"]:
+            return None
+
+    return submit_remediation(
+        entry["severity"], service_id, node_id, incident_id
+    )
+
+
+# =========================================================
+# Executor Stats
+# =========================================================
+def remediation_stats():
+
+    with _lock:
+        completed = _stats["succeeded"] + _stats["failed"]
+
+        actions = []
+
+        for (action, backend), entry in _action_stats.items():
+
+            count = entry["succeeded"] + entry["failed"]
+
+            actions.append({
+                "action": action,
+                "backend": backend,
+                "count": count,
+                "success_rate": round(entry["succeeded"] / count, 3),
+                "avg_end_to_end_ms": round(entry["total_ms"] / count, 2),
+                "max_end_to_end_ms": round(entry["max_ms"], 2)
+            })
+
+        return {
+            **_stats,
+            "in_flight": len(_pending),
+            "deferred": len(_deferred),
+            "avg_duration_ms": (
+                round(_stats["total_duration_ms"] / completed, 2)
+                if completed else None
+            ),
+            "actions": actions,
+            "recent": list(_recent)[-10:]
+        }
@@ -0,0 +1,386 @@
+import threading
+import logging
+import warnings
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bharat.services.database import (
+    get_cursor,
+    get_connection,
+    METRIC_COLUMNS,
+    ROLLUP_TABLES
+)
+from bharat.services.config import (
+    RAW_RETENTION_HOURS,
+    ROLLUP_1M_RETENTION_DAYS,
+    ROLLUP_1H_RETENTION_DAYS,
+    RETENTION_JOB_INTERVAL,
+    ROLLUP_MAX_ROWS,
+    ROLLUP_LATENESS_SECONDS,
+    RISK_HISTORY_RETENTION_DAYS,
+    REMEDIATION_RETENTION_DAYS,
+    VACUUM_INTERVAL_HOURS
+)
+
+
+logger = logging.getLogger("RETENTION")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Rollup Tiers
+# =========================================================
+# ISO timestamps truncate cleanly to their bucket:
+# "2026-01-01T12:34:56.789" -> "2026-01-01T12:34" (1m) / "2026-01-01T12" (1h)
+#
+# Each tier reads the one below it: 1m from raw samples, 1h from
+# the 1m buckets, so an hour costs 60 rows per target, not 720.
+ROLLUP_TIERS = {
+    "1m": {
+        "prefix": 16,
+        "suffix": ":00",
+        "step": timedelta(minutes=1),
+        "source": None,
+        "retention": timedelta(days=ROLLUP_1M_RETENTION_DAYS)
+    },
+    "1h": {
+        "prefix": 13,
+        "suffix": ":00:00",
+        "step": timedelta(hours=1),
+        "source": "1m",
+        "retention": timedelta(days=ROLLUP_1H_RETENTION_DAYS)
+    }
+}
+
+# Append-only history tables: table -> (timestamp column, retention)
+HISTORY_TABLES = {
+    "risk_history": ("timestamp", timedelta(days=RISK_HISTORY_RETENTION_DAYS)),
+    "remediation_actions": ("requested_at", timedelta(days=REMEDIATION_RETENTION_DAYS))
+}
+
+STATS = ("min", "max", "mean", "p95")
+
+VALUE_NAMES = [f"{c}_{s}" for c in METRIC_COLUMNS for s in STATS]
+
+_last_vacuum = 0
+
+
+# =========================================================
+# Watermarks
+# =========================================================
+def _get_watermark(cursor, tier):
+
+    cursor.execute(
+        "SELECT watermark FROM rollup_state WHERE tier = ?", (tier,)
+    )
+
+    row = cursor.fetchone()
+    return row[0] if row else ""
+
+
+def _set_watermark(cursor, tier, watermark):
+
+    cursor.execute("""
+        INSERT INTO rollup_state (tier, watermark) VALUES (?, ?)
+        ON CONFLICT(tier) DO UPDATE SET watermark = excluded.watermark
+    """, (tier, watermark))
+
+
+# =========================================================
+# Aggregate One Bucket
+# =========================================================
+def _finish(stats):
+
+    # Column-major so the order matches <column>_<stat>; a column
+    # with no values at all (e.g. no app metrics) is stored as NULL
+    return [
+        None if np.isnan(v) else float(v)
+        for v in np.vstack(stats).T.ravel()
+    ]
+
+
+def _aggregate_raw(values):
+
+    # values: (samples, columns), NULL metrics as NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        return len(values), _finish([
+            np.nanmin(values, axis=0),
+            np.nanmax(values, axis=0),
+            np.nanmean(values, axis=0),
+            np.nanpercentile(values, 95, axis=0)
+        ])
+
+
+def _aggregate_buckets(values):
+
+    # values: (buckets, 1 + columns * stats) -- samples, then the
+    # lower tier's <column>_<stat> values
+    samples = values[:, 0]
+    stats = values[:, 1:].reshape(len(values), len(METRIC_COLUMNS), len(STATS))
+
+    mins, maxes, means, p95s = (stats[:, :, i] for i in range(len(STATS)))
+
+    # Sample-weighted mean over the buckets that had the column
+    weights = np.where(np.isnan(means), 0.0, samples[:, None])
+    total = weights.sum(axis=0)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        mean = np.where(
+            total > 0,
+            np.nansum(means * weights, axis=0) / np.maximum(total, 1),
+            np.nan
+        )
+
+        # The lower tier keeps no raw samples, so p95 is taken over
+        # its bucket p95s: an approximation, bounded by the true max
+        return int(samples.sum()), _finish([
+            np.nanmin(mins, axis=0),
+            np.nanmax(maxes, axis=0),
+            mean,
+            np.nanpercentile(p95s, 95, axis=0)
+        ])
+
+
+# =========================================================
+# Roll the Tier Below Into a Tier
+# =========================================================
+def _next_bucket(spec, bucket):
+
+    start = datetime.fromisoformat(bucket + spec["suffix"])
+
+    return (start + spec["step"]).isoformat()[:spec["prefix"]]
+
+
+def rollup_tier(tier, now=None):
+    """
+    Aggregate every complete bucket above the tier watermark.
+    Returns the number of buckets written.
+    """
+
+    spec = ROLLUP_TIERS[tier]
+    prefix = spec["prefix"]
+    source = spec["source"]
+
+    now = now or datetime.utcnow()
+
+    # Hold back by the lateness margin so write-behind rows that
+    # flush late still land above the watermark; the bucket still
+    # being filled is left for the next pass
+    cutoff = (now - timedelta(seconds=ROLLUP_LATENESS_SECONDS)).isoformat()[:prefix]
+
+    if source is None:
+        table, time_column, columns = "metrics", "timestamp", METRIC_COLUMNS
+        aggregate = _aggregate_raw
+    else:
+        table, time_column = ROLLUP_TABLES[source], "bucket"
+        columns = ["samples"] + VALUE_NAMES
+        aggregate = _aggregate_buckets
+
+    select_sql = f"""
+        SELECT {time_column}, node_id, service_id, {", ".join(columns)}
+        FROM {table}
+        WHERE {time_column} >= ? AND {time_column} < ?
+        ORDER BY {time_column}
+    """
+
+    insert_sql = f"""
+        INSERT OR REPLACE INTO metrics_{tier} (
+            bucket, node_id, service_id, samples, {", ".join(VALUE_NAMES)}
+        )
+        VALUES ({", ".join("?" * (4 + len(VALUE_NAMES)))})
+    """
+
+    with get_cursor() as cursor:
+
+        watermark = _get_watermark(cursor, tier)
+
+        # Never read past what the source tier has finished
+        if source is not None:
+            cutoff = min(cutoff, _get_watermark(cursor, source)[:prefix])
+
+        if watermark >= cutoff:
+            return 0
+
+        cursor.execute(select_sql + " LIMIT ?", (watermark, cutoff, ROLLUP_MAX_ROWS))
+
+        rows = cursor.fetchall()
+
+        if not rows:
+            return 0
+
+        # -------------------------------------------------
+        # A full read may have cut the last bucket short
+        # -------------------------------------------------
+        if len(rows) == ROLLUP_MAX_ROWS:
+            first = rows[0][0][:prefix]
+            last = rows[-1][0][:prefix]
+
+            if first < last:
+                cutoff = last
+                rows = [r for r in rows if r[0][:prefix] < cutoff]
+
+            else:
+                # One bucket larger than the cap: read it whole
+                # rather than stall (and hold back raw deletion)
+                cutoff = _next_bucket(spec, first)
+
+                cursor.execute(select_sql, (watermark, cutoff))
+                rows = cursor.fetchall()
+
+        groups = {}
+
+        for row in rows:
+            key = (row[0][:prefix], row[1], row[2])
+            groups.setdefault(key, []).append(row[3:])
+
+        records = []
+
+        for (bucket, node_id, service_id), values in groups.items():
+
+            # NULLs become NaN and are left out of every statistic
+            samples, stats = aggregate(np.array(values, dtype=float))
+
+            records.append((
+                bucket + spec["suffix"],
+                node_id,
+                service_id,
+                samples,
+                *stats
+            ))
+
+        cursor.executemany(insert_sql, records)
+
+        _set_watermark(cursor, tier, cutoff)
+
+    return len(records)
+
+
+# =========================================================
+# Retention
+# =========================================================
+def apply_retention(now=None):
+
+    now = now or datetime.utcnow()
+
+    deleted = {}
+
+    with get_cursor() as cursor:
+
+        watermarks = {tier: _get_watermark(cursor, tier) for tier in ROLLUP_TIERS}
+
+        # Never drop rows a tier reading them has not rolled up yet
+        def clamp(cutoff, source):
+            return min([cutoff] + [
+                watermarks[tier]
+                for tier, spec in ROLLUP_TIERS.items()
+                if spec["source"] == source
+            ])
+
+        raw_cutoff = (now - timedelta(hours=RAW_RETENTION_HOURS)).isoformat()
+
+        cursor.execute(
+            "DELETE FROM metrics WHERE timestamp < ?", (clamp(raw_cutoff, None),)
+        )
+        deleted["raw"] = cursor.rowcount
+
+        for tier, spec in ROLLUP_TIERS.items():
+
+            cutoff = clamp((now - spec["retention"]).isoformat(), tier)
+
+            cursor.execute(
+                f"DELETE FROM metrics_{tier} WHERE bucket < ?", (cutoff,)
+            )
+            deleted[tier] = cursor.rowcount
+
+        for table, (column, retention) in HISTORY_TABLES.items():
+
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {column} < ?",
+                ((now - retention).isoformat(),)
+            )
+            deleted[table] = cursor.rowcount
+
+    return deleted
+
+
+# =========================================================
+# Vacuum
+# =========================================================
+def vacuum_if_due():
+
+    global _last_vacuum
+
+    if time.time() - _last_vacuum < VACUUM_INTERVAL_HOURS * 3600:
+        return False
+
+    # VACUUM cannot run inside a transaction or on a pooled connection
+    conn = get_connection()
+    conn.isolation_level = None
+
+    try:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    _last_vacuum = time.time()
+    return True
+
+
+# =========================================================
+# Compaction Pass
+# =========================================================
+def compact_metrics():
+
+    rolled = {tier: rollup_tier(tier) for tier in ROLLUP_TIERS}
+    deleted = apply_retention()
+    vacuumed = vacuum_if_due()
+
+    if any(rolled.values()) or any(deleted.values()):
+        logger.info(f"Compaction: rolled {rolled}, deleted {deleted}")
+
+    return {"rolled": rolled, "deleted": deleted, "vacuumed": vacuumed}
+
+
+# =========================================================
+# Background Job
+# =========================================================
+_job = None
+
+
+def _retention_loop():
+
+    global _last_vacuum
+
+    # First vacuum one interval after start, not at boot
+    _last_vacuum = time.time()
+
+    while True:
+
+        try:
+            compact_metrics()
+        except Exception as e:
+            logger.error(f"Compaction failed: {e}")
+
+        time.sleep(RETENTION_JOB_INTERVAL)
+
+
+def start_retention_job():
+
+    global _job
+
+    if _job is not None:
+        return
+
+    _job = threading.Thread(
+        target=_retention_loop,
+        name="metric-retention",
+        daemon=True
+    )
+    _job.start()
@@ -1,9 +1,16 @@
 from bharat.services.ml_engine import (
-    train_anomaly_model,
-    detect_anomaly,
-    forecast_cpu
+    score_anomalies,
+    forecast_cpu,
+    anomaly_model_ready,
+    get_anomaly_model
+)
+from bharat.services.metric_window import get_window
+from bharat.services.config import (
+    DEFAULT_NODE_ID,
+    DEFAULT_SERVICE_ID,
+    ANOMALY_SCORE_BASELINE,
+    ANOMALY_RISK_WEIGHT
 )
-from bharat.services.database import get_recent_metrics
 
 
 # =========================================================
@@ -16,6 +23,11 @@ ERROR_CRITICAL = 0.1
 
 SUSTAINED_COUNT = 3
 
+# Risk at which a "Failure Risk" incident opens, and the most the
+# CPU forecast can add to it
+RISK_INCIDENT = 70
+FORECAST_WEIGHT = 30
+
 
 # =========================================================
 # Warm-Up Configuration
@@ -26,10 +38,13 @@ WARMUP_SAMPLES = 360   # ≈ 30 minutes at 5-sec interval
 # =========================================================
 # Warm-Up Status
 # =========================================================
-def warmup_status():
+def warmup_status(node_id=DEFAULT_NODE_ID, service_id=DEFAULT_SERVICE_ID):
 
-    history = get_recent_metrics(WARMUP_SAMPLES)
-    count = len(history)
+    count = min(len(get_window(node_id, service_id)), WARMUP_SAMPLES)
+
+    # A model restored from disk needs no fresh warm-up
+    if count < WARMUP_SAMPLES and anomaly_model_ready(node_id, service_id):
+        return False, 100
 
     progress = min(100, (count / WARMUP_SAMPLES) * 100)
 
@@ -51,58 +66,90 @@ def calculate_current_risk(metrics):
     return score
 
 
+# =========================================================
+# Anomaly Contribution (blended, not a flat bump)
+# =========================================================
+def anomaly_risk(calibrated):
+
+    # Zero up to the baseline, then linear up to the full weight
+    excess = (calibrated - ANOMALY_SCORE_BASELINE) / (1 - ANOMALY_SCORE_BASELINE)
+
+    return max(0.0, min(excess, 1.0)) * ANOMALY_RISK_WEIGHT
+
+
 # =========================================================
 # Sustained High CPU Detection
 # =========================================================
-def sustained_cpu_high():
+def sustained_cpu_high(node_id=DEFAULT_NODE_ID, service_id=DEFAULT_SERVICE_ID):
 
-    history = get_recent_metrics(SUSTAINED_COUNT)
+    cpu_values = get_window(node_id, service_id).column(
+        "cpu_usage", SUSTAINED_COUNT
+    )
 
-    if len(history) < SUSTAINED_COUNT:
+    if len(cpu_values) < SUSTAINED_COUNT:
         return False
 
-    cpu_values = [row[0] for row in history]
-
-    return all(cpu >= HIGH_CPU for cpu in cpu_values)
+    return bool((cpu_values >= HIGH_CPU).all())
 
 
 # =========================================================
 # Failure Probability Calculation
 # =========================================================
-def calculate_failure_probability(metrics):
+def calculate_failure_probability(metrics, anomaly=None, run_ml=True):
+    """
+    ``anomaly`` is this target's entry from ``score_anomalies`` when
+    the caller already scored a batch; otherwise it is scored here.
+    With ``run_ml`` False (quiet sample) only the current stress
+    score is used; the anomaly model is still fitted and retrained
+    so it is ready when a sample is flagged.
+    """
 
     risk_score = calculate_current_risk(metrics)
 
     # -----------------------------
     # Warm-Up Check
     # -----------------------------
-    warming, progress = warmup_status()
+    node_id = metrics["node_id"]
+    service_id = metrics["service_id"]
+
+    warming, progress = warmup_status(node_id, service_id)
 
     if warming:
-        return risk_score, None, progress, True
+        return risk_score, None, progress, True, None
+
+    if not run_ml:
+        get_anomaly_model(node_id, service_id)
+        return min(risk_score, 100), None, 100, False, None
 
     future_cpu = None
 
     # -----------------------------
     # Anomaly contribution
     # -----------------------------
-    model = train_anomaly_model()
+    if anomaly is None:
+        key = (node_id, service_id)
+        anomaly = score_anomalies({key: metrics}).get(key)
+
+    calibrated = anomaly["calibrated"] if anomaly is not None else None
 
-    if detect_anomaly(model, metrics):
-        risk_score += 20
+    if calibrated is not None:
+        risk_score += anomaly_risk(calibrated)
 
     # -----------------------------
     # Forecast contribution
     # -----------------------------
-    future_cpu = forecast_cpu()
+    # Skip the forecast only when even its full weight could not
+    # lift the score to an incident
+    if risk_score + FORECAST_WEIGHT >= RISK_INCIDENT:
+        future_cpu = forecast_cpu(node_id, service_id)
 
     if future_cpu is not None:
-        forecast_risk = min(future_cpu / CRITICAL_CPU, 1.0) * 30
+        forecast_risk = min(future_cpu / CRITICAL_CPU, 1.0) * FORECAST_WEIGHT
         risk_score += forecast_risk
 
     risk_score = min(risk_score, 100)
 
-    return risk_score, future_cpu, 100, False
+    return risk_score, future_cpu, 100, False, anomaly
 
 
 # =========================================================
@@ -112,7 +159,7 @@ def estimate_time_to_failure(metrics, future_cpu):
 
     current_cpu = metrics["cpu_usage"]
 
-    if sustained_cpu_high():
+    if sustained_cpu_high(metrics["node_id"], metrics["service_id"]):
         return 10
 
     if current_cpu >= CRITICAL_CPU:
@@ -0,0 +1,43 @@
+import threading
+
+from bharat.services.event_bus import add_listener
+
+
+# =========================================================
+# Latest Risk per Target (in memory)
+# =========================================================
+# Fed by "risk" events, so it works wherever the events are
+# published or relayed — no DB read on the serving path.
+_latest = {}
+_lock = threading.Lock()
+
+
+def update_risk_state(record):
+
+    key = (record["node_id"], record["service_id"])
+
+    with _lock:
+        _latest[key] = record
+
+
+def get_latest_risk(node_id=None, service_id=None):
+    """Latest record for a target, or for every target."""
+
+    with _lock:
+
+        if node_id is not None and service_id is not None:
+            return _latest.get((node_id, service_id))
+
+        return [
+            record for (node, service), record in _latest.items()
+            if node_id in (None, node) and service_id in (None, service)
+        ]
+
+
+def _on_event(event, data):
+
+    if event == "risk":
+        update_risk_state(data)
+
+
+add_listener(_on_event)
@@ -1,9 +1,30 @@
 import time
+import random
 import logging
-
-from bharat.services.metrics_services import collect_metrics
-from bharat.services.detection_engine import analyze_metrics
-from bharat.services.remediation_service import trigger_remediation
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from bharat.services.metrics_services import collect_metrics, start_cpu_sampler
+from bharat.services.detection_engine import analyze_metrics, should_run_ml
+from bharat.services.risk_engine import warmup_status
+from bharat.services.ml_engine import score_anomalies, restore_models
+from bharat.services.remediation_service import submit_remediation, retry_deferred
+from bharat.services.metric_window import warm_windows
+from bharat.services.migrations import run_migrations
+from bharat.services.event_bus import publish
+from bharat.services.ingest_service import enqueue_risk
+from bharat.services.database import METRIC_COLUMNS
+from bharat.services.retention_service import start_retention_job
+from bharat.services.target_registry import (
+    get_target,
+    list_targets,
+    load_configured_targets
+)
+from bharat.services.config import (
+    METRIC_COLLECTION_INTERVAL,
+    SCHEDULER_MAX_WORKERS,
+    SCHEDULER_START_JITTER,
+    SCHEDULER_BATCH_WAIT
+)
 
 
 # =========================================================
@@ -11,7 +32,7 @@ from bharat.services.remediation_service import trigger_remediation
 # =========================================================
 logging.basicConfig(level=logging.WARNING)
 
-INTERVAL = 5  # seconds
+INTERVAL = METRIC_COLLECTION_INTERVAL  # seconds
 
 
 # =========================================================
@@ -23,9 +44,14 @@ def print_header():
     print("=" * 60)
 
 
+def target_label(node_id, service_id):
+    return f"node {node_id}/svc {service_id}"
+
+
 def print_metrics(metrics):
     print(
-        f"📊 CPU: {metrics['cpu_usage']:.1f}% | "
+        f"📊 [{target_label(metrics['node_id'], metrics['service_id'])}] "
+        f"CPU: {metrics['cpu_usage']:.1f}% | "
         f"MEM: {metrics['memory_usage']:.1f}% | "
         f"DISK: {metrics['disk_usage']:.1f}% | "
         f"ERR: {metrics['error_rate']:.3f}"
@@ -51,82 +77,343 @@ def print_incident(incident_id, severity, risk, eta):
     print(f"ETA to Failure: {eta_text}")
 
 
+def print_ongoing(incident_id, severity, risk):
+    print(f"🔁 Incident #{incident_id} ongoing — {severity}, Risk: {risk:.1f}%")
+
+
 def print_remediation(remediation):
     print("🛠️ Remediation Action:")
     print(remediation)
 
 
 # =========================================================
-# Main Scheduler Loop
+# Risk Record (one per cycle)
 # =========================================================
-def start_scheduler():
+def build_risk_record(metrics, result):
+
+    return {
+        "timestamp": metrics["timestamp"],
+        "node_id": metrics["node_id"],
+        "service_id": metrics["service_id"],
+        "risk": round(result.get("risk", 0), 2),
+        "severity": result.get("severity", "LOW"),
+        "future_cpu": result.get("future_cpu"),
+        "eta_minutes": result.get("eta_minutes"),
+        "anomaly": int(bool(result.get("anomaly"))),
+        "warmup": int(bool(result.get("warmup"))),
+        "anomaly_score": result.get("anomaly_score"),
+        "anomaly_contributions": result.get("anomaly_contributions"),
+        "progress": result.get("progress"),
+        "incident_id": result.get("incident_id")
+    }
 
-    print_header()
 
-    while True:
+# =========================================================
+# Step 1 — Collect metrics
+# =========================================================
+def collect_cycle(node_id, service_id):
 
-        cycle_start = time.time()
+    try:
+        metrics = collect_metrics(node_id, service_id)
 
-        try:
-            # -------------------------------------------------
-            # Step 1 — Collect metrics
-            # -------------------------------------------------
-            metrics = collect_metrics()
+        if not metrics:
+            print(f"⚠️ No metrics collected for {target_label(node_id, service_id)}")
+            return None
 
-            if not metrics:
-                print("⚠️ No metrics collected")
-                time.sleep(INTERVAL)
-                continue
+        print_metrics(metrics)
 
-            print_metrics(metrics)
+        publish("metrics", {
+            "timestamp": metrics["timestamp"],
+            "node_id": node_id,
+            "service_id": service_id,
+            **{name: metrics[name] for name in METRIC_COLUMNS}
+        })
 
-            # -------------------------------------------------
-            # Step 2 — ML Analysis
-            # -------------------------------------------------
-            result = analyze_metrics(metrics)
+        return metrics
 
-            # -------------------------------------------------
-            # Incident Handling
-            # -------------------------------------------------
-            if result.get("anomaly"):
+    except Exception as e:
+        print(f"❌ Scheduler error ({target_label(node_id, service_id)}): {e}")
+        return None
+
+
+# =========================================================
+# Step 2 — ML Analysis
+# =========================================================
+def analyze_cycle(metrics, anomaly=None):
+
+    node_id = metrics["node_id"]
+    service_id = metrics["service_id"]
+
+    try:
+        result = analyze_metrics(metrics, anomaly)
+
+        # Persisted with the metrics batch, served from memory
+        risk_record = build_risk_record(metrics, result)
+
+        enqueue_risk(risk_record)
+        publish("risk", risk_record)
+
+        # -------------------------------------------------
+        # Incident Handling
+        # -------------------------------------------------
+        if result.get("anomaly"):
+
+            severity = result.get("severity")
+            incident_id = result.get("incident_id")
+            risk = result.get("risk", 0)
+            eta = result.get("eta_minutes")
+
+            # Ongoing incidents were remediated when opened, unless
+            # that request was deferred by cooldown or throttling
+            if result.get("incident_state") == "ongoing":
+                print_ongoing(incident_id, severity, risk)
 
-                severity = result.get("severity")
-                incident_id = result.get("incident_id")
-                risk = result.get("risk", 0)
-                eta = result.get("eta_minutes")
+                remediation = retry_deferred(
+                    service_id=metrics.get("service_id"),
+                    node_id=metrics.get("node_id"),
+                    incident_id=incident_id
+                )
 
+                if remediation is not None:
+                    print_remediation(remediation)
+
+            else:
                 print_incident(incident_id, severity, risk, eta)
 
-                remediation = trigger_remediation(
+                # Queued on the remediation pool; never blocks the cycle
+                remediation = submit_remediation(
                     severity=severity,
                     service_id=metrics.get("service_id"),
-                    node_id=metrics.get("node_id")
+                    node_id=metrics.get("node_id"),
+                    incident_id=incident_id
                 )
 
                 print_remediation(remediation)
 
-            # -------------------------------------------------
-            # Warm-Up Mode
-            # -------------------------------------------------
-            elif result.get("warmup"):
+        # -------------------------------------------------
+        # Warm-Up Mode
+        # -------------------------------------------------
+        elif result.get("warmup"):
+
+            progress = result.get("progress", 0)
+            print_warmup(progress)
+
+        # -------------------------------------------------
+        # Healthy Mode
+        # -------------------------------------------------
+        else:
+
+            print_healthy(result.get("risk", 0))
+
+        return result
+
+    except Exception as e:
+        print(f"❌ Scheduler error ({target_label(node_id, service_id)}): {e}")
+        return None
 
-                progress = result.get("progress", 0)
-                print_warmup(progress)
+
+# =========================================================
+# Single Target Cycle
+# =========================================================
+def run_cycle(node_id, service_id):
+
+    metrics = collect_cycle(node_id, service_id)
+
+    if not metrics:
+        return None
+
+    return analyze_cycle(metrics)
+
+
+# =========================================================
+# Batch Anomaly Scoring (all targets collected together)
+# =========================================================
+def score_collected(collected):
+
+    # Warming targets skip ML entirely in the risk engine; quiet
+    # samples are filtered out by the streaming stats and only get
+    # their model fit/retrain check there
+    samples = {
+        key: metrics
+        for key, metrics in collected.items()
+        if metrics and not warmup_status(*key)[0] and should_run_ml(metrics)
+    }
+
+    if not samples:
+        return {}
+
+    try:
+        return score_anomalies(samples)
+    except Exception as e:
+        print(f"❌ Batch scoring error: {e}")
+        return {}
+
+
+# =========================================================
+# Batch Dispatch (the scheduler loop never waits on it)
+# =========================================================
+def _score_batch(executor, collects, cycles):
+
+    pending = set(collects)
+    handed_off = set()
+
+    # Most of a tick arrives together; stragglers are then scored
+    # as they complete rather than holding up the rest
+    done, pending = wait(pending, timeout=SCHEDULER_BATCH_WAIT)
+
+    try:
+        while True:
+
+            collected = {}
+
+            for future in done:
+
+                key = collects[future]
+                metrics = future.result()
+
+                if metrics:
+                    collected[key] = metrics
+                else:
+                    cycles[key].set_result(None)
+
+            scores = score_collected(collected)
+
+            for key, metrics in collected.items():
+
+                analysis = executor.submit(analyze_cycle, metrics, scores.get(key))
+                handed_off.add(key)
+
+                analysis.add_done_callback(
+                    lambda _, cycle=cycles[key]: cycle.set_result(None)
+                )
+
+            if not pending:
+                return
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    except Exception as e:
+        print(f"❌ Batch dispatch error: {e}")
+
+        # Never leave a target looking busy forever
+        for key, cycle in cycles.items():
+            if key not in handed_off and not cycle.done():
+                cycle.set_result(None)
+
+
+def dispatch_batch(executor, scorer, due):
+    """
+    Collect ``due`` targets on ``executor`` and hand the batch to
+    ``scorer``; returns immediately with one future per target that
+    completes when its whole cycle has.
+    """
+
+    cycles = {key: Future() for key in due}
+
+    collects = {
+        executor.submit(collect_cycle, *key): key
+        for key in due
+    }
+
+    scorer.submit(_score_batch, executor, collects, cycles)
+
+    return cycles
+
+
+# =========================================================
+# Main Scheduler Loop
+# =========================================================
+def start_scheduler(max_workers=SCHEDULER_MAX_WORKERS):
+
+    print_header()
+
+    run_migrations()
+
+    # Rollups, retention and vacuum run in the background
+    start_retention_job()
+
+    # First CPU window completes while the rest starts up
+    start_cpu_sampler()
+
+    # Load recent history into the in-memory windows once
+    targets = warm_windows()
+    print(f"📦 Metric windows warmed for {targets} target(s)")
+
+    if not list_targets():
+        load_configured_targets()
+
+    # Saved models skip warm-up and the first fit
+    restored = restore_models(list_targets())
+
+    if restored:
+        print(f"💾 Restored {restored} saved anomaly model(s)")
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="sentinel-cycle"
+    )
+
+    # Waits on collections and scores batches, off the dispatch loop
+    scorer = ThreadPoolExecutor(
+        max_workers=1,
+        thread_name_prefix="sentinel-score"
+    )
+
+    # Next due time per target; first cycle is jittered so
+    # many targets do not all fire on the same tick
+    schedule = {}
+    in_flight = {}
+
+    while True:
+
+        now = time.time()
+
+        for target in list_targets():
+
+            key = (target["node_id"], target["service_id"])
+
+            if key not in schedule:
+                schedule[key] = now + random.uniform(0, SCHEDULER_START_JITTER)
+
+        due = []
+
+        for key in list(schedule):
+
+            target = get_target(*key)
+
+            # Target was unregistered
+            if target is None:
+                del schedule[key]
+                continue
+
+            if schedule[key] > now:
+                continue
 
             # -------------------------------------------------
-            # Healthy Mode
+            # Skip overrunning targets instead of piling up
             # -------------------------------------------------
+            running = in_flight.get(key)
+
+            if running is not None and not running.done():
+                print(f"⏱️ {target_label(*key)} still running, skipping cycle")
             else:
+                due.append(key)
 
-                print_healthy(result.get("risk", 0))
+            # Keep cadence; resync if we fell a whole interval behind
+            next_due = schedule[key] + target["interval"]
+            schedule[key] = next_due if next_due > now else now + target["interval"]
 
-        except Exception as e:
-            print(f"❌ Scheduler error: {e}")
+        # -------------------------------------------------
+        # Collect in parallel, score as a batch, then analyze
+        # each target on the pool -- without waiting here
+        # -------------------------------------------------
+        if due:
+            in_flight.update(dispatch_batch(executor, scorer, due))
 
         # -------------------------------------------------
-        # Maintain interval
+        # Sleep until the next target is due
         # -------------------------------------------------
-        elapsed = time.time() - cycle_start
-        sleep_time = max(0, INTERVAL - elapsed)
+        next_due = min(schedule.values(), default=now + INTERVAL)
+        sleep_time = max(0, min(next_due - time.time(), INTERVAL))
 
         time.sleep(sleep_time)
@@ -0,0 +1,75 @@
+import threading
+import logging
+
+from bharat.services.config import (
+    MONITORED_TARGETS,
+    METRIC_COLLECTION_INTERVAL
+)
+
+
+logger = logging.getLogger("TARGETS")
+logger.setLevel(logging.INFO)
+
+
+# =========================================================
+# Target Registry
+# =========================================================
+_targets = {}
+_lock = threading.Lock()
+
+
+def register_target(node_id, service_id, interval=METRIC_COLLECTION_INTERVAL,
+                    backend=None, commands=None):
+
+    target = {
+        "node_id": node_id,
+        "service_id": service_id,
+        "interval": interval,
+        "backend": backend,
+        "commands": commands
+    }
+
+    with _lock:
+        _targets[(node_id, service_id)] = target
+
+    logger.info(
+        f"Registered target node {node_id} service {service_id} "
+        f"every {interval}s"
+    )
+
+    return target
+
+
+def unregister_target(node_id, service_id):
+
+    with _lock:
+        return _targets.pop((node_id, service_id), None)
+
+
+def get_target(node_id, service_id):
+
+    with _lock:
+        return _targets.get((node_id, service_id))
+
+
+def list_targets():
+
+    with _lock:
+        return list(_targets.values())
+
+
+# =========================================================
+# Load Targets from Config
+# =========================================================
+def load_configured_targets():
+
+    for entry in MONITORED_TARGETS:
+        register_target(
+            entry["node_id"],
+            entry["service_id"],
+            entry.get("interval", METRIC_COLLECTION_INTERVAL),
+            entry.get("backend"),
+            entry.get("commands")
+        )
+
+    return list_targets()
@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from bharat.services import database
+from bharat.services.database import get_cursor, METRIC_COLUMNS
+from bharat.services.migrations import run_migrations
+from bharat.services.retention_service import rollup_tier, apply_retention
+
+
+START = datetime(2026, 1, 1)
+NOW = START + timedelta(hours=3)
+
+
+# =========================================================
+# Fixtures
+# =========================================================
+@pytest.fixture(autouse=True)
+def db(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "test.db"))
+
+    # Pooled connections would still point at the old file
+    database.close_pool()
+    run_migrations()
+
+    yield
+
+    database.close_pool()
+
+
+def _insert_raw(rows):
+
+    with get_cursor() as cursor:
+        cursor.executemany(f"""
+            INSERT INTO metrics (timestamp, node_id, service_id, {", ".join(METRIC_COLUMNS)})
+            VALUES (?, ?, ?, {", ".join("?" * len(METRIC_COLUMNS))})
+        """, rows)
+
+
+def _samples(hours=2, interval=10, seed=0):
+
+    rng = np.random.default_rng(seed)
+    rows = []
+
+    for i in range(hours * 3600 // interval):
+        timestamp = (START + timedelta(seconds=i * interval)).isoformat()
+        values = [round(float(v), 3) for v in rng.uniform(0, 100, len(METRIC_COLUMNS))]
+        rows.append((timestamp, 1, 1, *values))
+
+    return rows
+
+
+def _rollup_all(now=NOW):
+    return rollup_tier("1m", now), rollup_tier("1h", now)
+
+
+def _hour_rows():
+
+    with get_cursor() as cursor:
+        cursor.execute("SELECT * FROM metrics_1h ORDER BY bucket")
+        return [dict(row) for row in cursor.fetchall()]
+
+
+# =========================================================
+# Rollups
+# =========================================================
+def test_rerunning_a_rollup_writes_nothing():
+
+    _insert_raw(_samples())
+
+    minutes, hours = _rollup_all()
+
+    assert minutes == 120
+    assert hours == 2
+
+    assert _rollup_all() == (0, 0)
+    assert len(_hour_rows()) == 2
+
+
+def test_hourly_rollup_matches_raw():
+
+    rows = _samples()
+    _insert_raw(rows)
+    _rollup_all()
+
+    for hour in _hour_rows():
+
+        prefix = hour["bucket"][:13]
+        raw = np.array([r[3:] for r in rows if r[0].startswith(prefix)])
+
+        assert hour["samples"] == len(raw)
+
+        for i, column in enumerate(METRIC_COLUMNS):
+            assert hour[f"{column}_min"] == pytest.approx(raw[:, i].min())
+            assert hour[f"{column}_max"] == pytest.approx(raw[:, i].max())
+            assert hour[f"{column}_mean"] == pytest.approx(raw[:, i].mean())
+
+            # p95 of minute p95s is approximate but stays within range
+            assert raw[:, i].min() <= hour[f"{column}_p95"] <= raw[:, i].max()
+
+
+def test_null_columns_survive_rollup():
+
+    rows = []
+
+    for i, row in enumerate(_samples(hours=1)):
+        row = list(row)
+
+        # No app metrics at all; CPU missing on every other sample
+        row[6] = row[7] = None
+        if i % 2:
+            row[3] = None
+
+        rows.append(tuple(row))
+
+    _insert_raw(rows)
+    _rollup_all()
+
+    [hour] = _hour_rows()
+
+    cpu = [r[3] for r in rows if r[3] is not None]
+
+    assert hour["samples"] == len(rows)
+    assert hour["cpu_usage_mean"] == pytest.approx(np.mean(cpu))
+    assert hour["memory_usage_mean"] is not None
+
+    for column in ("response_time_ms", "error_rate"):
+        for stat in ("min", "max", "mean", "p95"):
+            assert hour[f"{column}_{stat}"] is None
+
+
+# =========================================================
+# Retention
+# =========================================================
+def _count(table):
+
+    with get_cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+
+
+def test_retention_removes_only_rows_past_cutoff():
+
+    now = START + timedelta(days=40)
+
+    _insert_raw([
+        ((now - timedelta(hours=25)).isoformat(), 1, 1, 1, 1, 1, 1, 0),
+        ((now - timedelta(hours=23)).isoformat(), 1, 1, 1, 1, 1, 1, 0)
+    ])
+
+    with get_cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO risk_history (timestamp, node_id, service_id, risk) VALUES (?, 1, 1, 10)",
+            [((now - timedelta(days=31)).isoformat(),), ((now - timedelta(days=29)).isoformat(),)]
+        )
+
+    rollup_tier("1m", now)
+
+    deleted = apply_retention(now)
+
+    assert deleted["raw"] == 1
+    assert deleted["risk_history"] == 1
+    assert _count("metrics") == 1
+    assert _count("risk_history") == 1
+    assert _count("metrics_1m") == 2
+
+
+def test_retention_keeps_rows_not_rolled_up():
+
+    now = START + timedelta(days=2)
+
+    _insert_raw([((now - timedelta(hours=25)).isoformat(), 1, 1, 1, 1, 1, 1, 0)])
+
+    assert apply_retention(now)["raw"] == 0
+    assert _count("metrics") == 1
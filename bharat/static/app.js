@@ -6,6 +6,10 @@ document.addEventListener('DOMContentLoaded', () => {
     // -------------------------------------------------------------------------
     const API_BASE = '/api';
     const REFRESH_RATE = 3000;
+    const HISTORY_SIZE = 20;
+
+    // Latest state, patched in place by stream deltas
+    const state = { health: {}, risk: {}, metrics: [], incidents: [] };
 
     // -------------------------------------------------------------------------
     // 2. Chart Configurations
@@ -107,19 +111,98 @@ document.addEventListener('DOMContentLoaded', () => {
 
     async function sync() {
         try {
-            const [health, risk, metrics, incidents] = await Promise.all([
-                fetch(`${API_BASE}/health`).then(r => r.json()),
-                fetch(`${API_BASE}/risk/current`).then(r => r.json()),
-                fetch(`${API_BASE}/metrics/recent`).then(r => r.json()),
-                fetch(`${API_BASE}/incidents`).then(r => r.json())
-            ]);
-
-            updateUI(health, risk, metrics, incidents);
+            // One cached round trip; the browser revalidates via ETag
+            const res = await fetch(`${API_BASE}/dashboard/snapshot`);
+            const { health, risk, metrics, incidents } = await res.json();
+
+            Object.assign(state, { health, risk, metrics, incidents });
+            render();
         } catch (e) {
             console.error('Core sync error:', e);
         }
     }
 
+    function render() {
+        updateUI(state.health, state.risk, state.metrics, state.incidents);
+    }
+
+    // -------------------------------------------------------------------------
+    // 3.1 Live Stream (Server-Sent Events) — deltas instead of polling
+    // -------------------------------------------------------------------------
+
+    // Mirrors /api/health
+    function healthFromCpu(cpu) {
+        const score = Math.max(0, 100 - cpu);
+        const status = score > 70 ? 'HEALTHY' : score > 40 ? 'DEGRADED' : 'CRITICAL';
+        return { health_score: score, status };
+    }
+
+    function onMetrics(m) {
+        state.metrics.unshift({
+            cpu: m.cpu_usage,
+            memory: m.memory_usage,
+            disk: m.disk_usage,
+            response_time: m.response_time_ms,
+            error_rate: m.error_rate
+        });
+        state.metrics.length = Math.min(state.metrics.length, HISTORY_SIZE);
+        state.health = healthFromCpu(m.cpu_usage);
+        render();
+    }
+
+    function onIncident(i) {
+        state.incidents.unshift(i);
+        state.incidents.length = Math.min(state.incidents.length, HISTORY_SIZE);
+        state.risk = {
+            latest_incident: i.root_cause,
+            severity: i.severity,
+            timestamp: i.created_at
+        };
+        render();
+    }
+
+    function onIncidentResolved(r) {
+        const match = state.incidents.find(i => i.id === r.id);
+        if (match) {
+            match.status = r.status;
+            render();
+        }
+    }
+
+    let pollTimer = null;
+
+    function startPolling() {
+        if (!pollTimer) pollTimer = setInterval(sync, REFRESH_RATE);
+    }
+
+    function stopPolling() {
+        clearInterval(pollTimer);
+        pollTimer = null;
+    }
+
+    function connectStream() {
+        if (!window.EventSource) {
+            startPolling();
+            return;
+        }
+
+        const source = new EventSource(`${API_BASE}/stream`);
+        const parse = (handler) => (e) => handler(JSON.parse(e.data));
+
+        source.addEventListener('metrics', parse(onMetrics));
+        source.addEventListener('incident', parse(onIncident));
+        source.addEventListener('incident_resolved', parse(onIncidentResolved));
+
+        // Resync once after (re)connecting so no deltas are missed
+        source.onopen = () => {
+            stopPolling();
+            sync();
+        };
+
+        // Poll while the stream is down; EventSource retries by itself
+        source.onerror = () => startPolling();
+    }
+
     function updateUI(health, risk, metrics, incidents) {
         const latest = metrics[0] || {};
 
@@ -232,7 +315,7 @@ document.addEventListener('DOMContentLoaded', () => {
         document.getElementById('current-time').textContent = new Date().toLocaleTimeString('en-US', { hour12: false });
     }, 1000);
 
-    // Initial and periodic sync
+    // Initial snapshot, then live deltas
     sync();
-    setInterval(sync, REFRESH_RATE);
+    connectStream();
 });
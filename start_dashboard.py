@@ -1,6 +1,8 @@
 import os
 import sys
-import threading
+import time
+
+_started = time.perf_counter()
 
 # Add the current directory to sys.path so 'bharat' package can be found
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,22 +13,18 @@ print(f"📂 Project Root: {current_dir}")
 
 try:
     from bharat.app import app
-    from bharat.services.scheduler_service import start_scheduler
+    from bharat.services.engine_process import start_engine
+    from bharat.services.lazy_imports import print_startup_report
     
     print("✅ Backend modules loaded successfully.")
-    
-    # Start the scheduler in a background thread
-    # We use the app context to ensure the scheduler has access to the database
-    def run_scheduler():
-        print("🟢 Background Scheduler started from launcher")
-        with app.app_context():
-            start_scheduler()
-
-    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-    scheduler_thread.start()
+    print_startup_report("Dashboard backend", _started)
 
     # Run the Flask app
     if __name__ == "__main__":
+        # Monitoring engine runs in its own supervised process
+        # (or a background thread when ENGINE_MODE = "thread")
+        start_engine(app)
+
         app.run(host="127.0.0.1", port=5000, debug=False) # Turned off debug to avoid double start
         
 except ImportError as e: